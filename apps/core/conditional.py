@@ -0,0 +1,144 @@
+"""
+Conditional GET support (ETag / Last-Modified) for polled read endpoints.
+
+The validator is built from cheap change markers only (per-table indexed MAX(updated_at) plus a
+cached write counter, or payment summary cache versions), so an unchanged resource is answered with
+304 Not Modified before the view queries or serializes anything.
+"""
+
+import hashlib
+import time
+from datetime import date
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = ""
+
+
+def _counter_key(model) -> str:
+    return f"conditional:v:{model._meta.label_lower}"
+
+
+def _bump_counter(model) -> None:
+    key = _counter_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Clock-based start value: an evicted counter can't restart on a version that was already used
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+class _PendingBumps:
+    """Models written in one transaction; their counters are bumped once on commit, not once per row."""
+
+    def __init__(self):
+        self.models = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        for model in self.models:
+            _bump_counter(model)
+
+
+def _on_write(sender, using=None, **kwargs):
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        _bump_counter(sender)
+        return
+    for _, callback, _ in connection.run_on_commit:
+        if isinstance(callback, _PendingBumps) and not callback.done:
+            callback.models.add(sender)
+            return
+    pending = _PendingBumps()
+    pending.models.add(sender)
+    transaction.on_commit(pending, using=using)
+
+
+def track_changes(model) -> None:
+    """
+    Bump the model's write counter when a row is saved or deleted (on commit). Deletes leave
+    MAX(updated_at) unchanged, and queryset.delete() / cascades send post_delete for every row once a
+    receiver is connected. Set-based updates don't send signals; they set updated_at instead.
+    """
+    post_save.connect(_on_write, sender=model, dispatch_uid=f"conditional-save-{model._meta.label_lower}")
+    post_delete.connect(_on_write, sender=model, dispatch_uid=f"conditional-delete-{model._meta.label_lower}")
+
+
+def table_markers(models) -> list:
+    """
+    (label, last change, write counter) per table: MAX(updated_at) through its index when the model
+    has it (falls back to the primary key), and the counters of all tables in one cache round trip.
+    """
+    keys = [_counter_key(model) for model in models]
+    counters = cache.get_many(keys)
+    markers = []
+    for model, key in zip(models, keys):
+        field_names = {f.name for f in model._meta.get_fields()}
+        column = "updated_at" if "updated_at" in field_names else "pk"
+        last = model._default_manager.order_by().aggregate(last=Max(column))["last"]
+        markers.append((model._meta.label, last, counters.get(key)))
+    return markers
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag / Last-Modified to GET responses and answer 304 when If-None-Match still matches.
+    Views declare what their payload depends on:
+      - conditional_models: models whose table markers are part of the validator (their saves and
+        deletes are tracked from the moment the view class is defined)
+      - get_conditional_parts(): any extra markers (e.g. payment summary cache versions)
+    The request path (with query string), the negotiated format and today's date are always included.
+    Last-Modified is informational; revalidation uses the ETag, which also changes on deletes.
+    """
+
+    conditional_models = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for model in cls.conditional_models:
+            track_changes(model)
+
+    def get_conditional_parts(self):
+        return []
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        if request.method not in ("GET", "HEAD"):
+            return
+
+        markers = table_markers(self.conditional_models)
+        parts = [request.get_full_path(), request.accepted_renderer.format, date.today().isoformat(), *markers, *self.get_conditional_parts()]
+        self.etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+        timestamps = [last for _, last, _ in markers if hasattr(last, "timestamp")]
+        self.last_modified = max(timestamps) if timestamps else None
+
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if self.etag in if_none_match or "*" in if_none_match:
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "etag", None) and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = self.etag
+            if self.last_modified is not None:
+                response["Last-Modified"] = http_date(self.last_modified.timestamp())
+            # Clients may keep the body but must revalidate on every use
+            response["Cache-Control"] = "private, no-cache"
+        return response
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.search import SEARCH_KINDS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the unit/tenant/owner search index from the source tables (after imports or raw SQL writes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--type", dest="kinds", action="append", choices=list(SEARCH_KINDS), help="Only rebuild this type (repeatable).")
+
+    def handle(self, *args, **options):
+        counts = rebuild_index(options["kinds"])
+        summary = ", ".join(f"{count} {kind}s" for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index: {summary}."))
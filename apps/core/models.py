@@ -43,7 +43,7 @@ class User(AbstractUser):
 class City(models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name_plural = "Cities"
@@ -56,7 +56,7 @@ class District(models.Model):
     name = models.CharField(max_length=100)
     city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="district_set")
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("name", "city")
@@ -64,3 +64,35 @@ class District(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.city.name})"
+
+
+class SearchEntry(models.Model):
+    """One searchable unit, tenant or owner (apps.core.search keeps these in sync on save/delete)."""
+
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True, default="")
+    # Normalized searchable text (lower-case, no accents, words separated by single spaces)
+    text = models.TextField()
+    trigram_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="unique_search_entry"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.title}"
+
+
+class SearchTrigram(models.Model):
+    """Distinct trigrams of a SearchEntry's text; lookups go trigram -> entries through the index."""
+
+    entry = models.ForeignKey(SearchEntry, related_name="trigrams", on_delete=models.CASCADE)
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["trigram", "entry"], name="search_trigram_idx"),
+        ]
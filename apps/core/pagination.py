@@ -0,0 +1,59 @@
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class SizedPageNumberPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination: no COUNT(*) and no OFFSET scan, so page N costs the same as page 1.
+    Subclasses set `ordering` to a stable, (nearly) unique ordering, e.g. ("-created_at", "-id").
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        # Honour ?ordering= when the view has an OrderingFilter, otherwise keep the paginator's ordering
+        # (DRF's default refuses to fall back when the filter is present but no ordering was requested)
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return tuple(ordering)
+        return (self.ordering,) if isinstance(self.ordering, str) else tuple(self.ordering)
+
+
+class HybridPagination(KeysetPagination):
+    """
+    Cursor pagination by default (`?cursor=`), numbered pages only when the client asks for `?page=`
+    (e.g. a table that shows page numbers). The numbered mode keeps the usual count/next/previous/results shape.
+    """
+
+    page_number_class = SizedPageNumberPagination
+
+    def __init__(self):
+        self.numbered = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.page_number_class.page_query_param in request.query_params:
+            self.numbered = self.page_number_class()
+            self.numbered.page_size = self.page_size
+            if not queryset.ordered:
+                queryset = queryset.order_by(*self.ordering)
+            return self.numbered.paginate_queryset(queryset, request, view)
+        self.numbered = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.numbered is not None:
+            return self.numbered.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            param for param in self.page_number_class().get_schema_operation_parameters(view) if param["name"] == self.page_number_class.page_query_param
+        ]
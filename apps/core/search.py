@@ -0,0 +1,155 @@
+"""
+Search index for units, tenants and owners.
+
+Each object gets a SearchEntry with its normalized text and one SearchTrigram row per distinct
+trigram of its words (padded like PostgreSQL's pg_trgm: "  ab", " ab", "ab "...). Lookups go from
+the query's trigrams to entries through the (trigram, entry) index instead of scanning the
+source tables, and work the same on PostgreSQL and SQLite. Entries are refreshed from the models'
+save()/delete() and can be rebuilt with `manage.py rebuild_search_index`.
+"""
+
+import unicodedata
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count
+
+from apps.core.models import SearchEntry, SearchTrigram
+
+# kind -> model, displayed title/subtitle attributes and the attributes that make up the text
+SEARCH_KINDS = {
+    "unit": {"model": "units.Unit", "title": "name", "subtitle": "location_text", "fields": ("name", "location_text")},
+    "tenant": {"model": "tenants.Tenant", "title": "full_name", "subtitle": "phone", "fields": ("full_name", "phone", "email")},
+    "owner": {"model": "owners.Owner", "title": "full_name", "subtitle": "phone", "fields": ("full_name", "phone", "email")},
+}
+# Minimum trigram similarity for a fuzzy (non-substring) hit, as pg_trgm's default
+SIMILARITY_THRESHOLD = 0.3
+# Entries sharing the most trigrams with the query that are ranked in Python
+MAX_CANDIDATES = 200
+
+
+def normalize(value) -> str:
+    """Lower-case, accents removed, anything but letters and digits turned into single spaces."""
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    chars = (c if c.isalnum() else " " for c in decomposed.casefold() if not unicodedata.combining(c))
+    return " ".join("".join(chars).split())
+
+
+def trigrams(text: str) -> set:
+    """Padded word trigrams of normalized text (every word, even one letter, yields some)."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _inner_trigrams(text: str) -> set:
+    """Unpadded trigrams of each word: contained in the trigrams of any text the query is a substring of."""
+    return {word[i : i + 3] for word in text.split() for i in range(len(word) - 2)}
+
+
+def index_objects(kind: str, objects) -> None:
+    """(Re)index these objects of `kind`: replaces their entries and trigrams."""
+    spec = SEARCH_KINDS[kind]
+    objects = [obj for obj in objects if obj.pk is not None]
+    if not objects:
+        return
+    with transaction.atomic():
+        SearchEntry.objects.filter(kind=kind, object_id__in=[obj.pk for obj in objects]).delete()
+        entries, grams = [], []
+        for obj in objects:
+            text = normalize(" ".join(str(getattr(obj, field) or "") for field in spec["fields"]))
+            obj_grams = trigrams(text)
+            entries.append(
+                SearchEntry(
+                    kind=kind,
+                    object_id=obj.pk,
+                    title=str(getattr(obj, spec["title"]) or "")[:255],
+                    subtitle=str(getattr(obj, spec["subtitle"]) or "")[:255],
+                    text=text,
+                    trigram_count=len(obj_grams),
+                )
+            )
+            grams.append(obj_grams)
+        entries = SearchEntry.objects.bulk_create(entries)
+        SearchTrigram.objects.bulk_create([SearchTrigram(entry=entry, trigram=gram) for entry, entry_grams in zip(entries, grams) for gram in entry_grams], batch_size=5000)
+
+
+def index_saved(kind: str, obj, update_fields=None) -> None:
+    """Re-index an object after save() unless update_fields shows no indexed field changed."""
+    spec = SEARCH_KINDS[kind]
+    if update_fields is None or set(update_fields) & {spec["title"], spec["subtitle"], *spec["fields"]}:
+        index_objects(kind, [obj])
+
+
+def remove_objects(kind: str, object_ids) -> None:
+    SearchEntry.objects.filter(kind=kind, object_id__in=list(object_ids)).delete()
+
+
+def rebuild_index(kinds=None, chunk_size: int = 500) -> dict:
+    """Rebuild the entries of `kinds` (default: all) from the source tables; returns {kind: count}."""
+    counts = {}
+    for kind in kinds or SEARCH_KINDS:
+        spec = SEARCH_KINDS[kind]
+        model = apps.get_model(spec["model"])
+        fields = {"pk", spec["title"], spec["subtitle"], *spec["fields"]}
+        with transaction.atomic():
+            SearchEntry.objects.filter(kind=kind).delete()
+            batch, counts[kind] = [], 0
+            for obj in model.objects.only(*fields - {"pk"}).order_by("pk").iterator(chunk_size=chunk_size):
+                batch.append(obj)
+                if len(batch) == chunk_size:
+                    index_objects(kind, batch)
+                    counts[kind] += len(batch)
+                    batch = []
+            index_objects(kind, batch)
+            counts[kind] += len(batch)
+    return counts
+
+
+def matching_ids(kind: str, value: str):
+    """
+    Subquery of object ids of `kind` whose indexed text contains `value` (icontains semantics on the
+    normalized text). The trigram index narrows candidates; the substring check runs on those only.
+    """
+    query = normalize(value)
+    entries = SearchEntry.objects.filter(kind=kind, text__contains=query)
+    required = _inner_trigrams(query)
+    if required:
+        candidates = SearchTrigram.objects.filter(trigram__in=required, entry__kind=kind).values("entry").annotate(hits=Count("trigram", distinct=True)).filter(hits=len(required)).values("entry")
+        entries = entries.filter(pk__in=candidates)
+    return entries.values("object_id")
+
+
+def search(value: str, kinds=None, limit: int = 20) -> list:
+    """
+    Ranked hits [{type, id, title, subtitle, score}] for `value` across `kinds` (default: all).
+    Score is the trigram similarity (0..1), plus 1 when the query is a substring of the text and
+    another 1 when the text starts with it; fuzzy hits below SIMILARITY_THRESHOLD are dropped.
+    """
+    query = normalize(value)
+    query_grams = trigrams(query)
+    if not query_grams:
+        return []
+    kinds = list(kinds or SEARCH_KINDS)
+
+    candidates = SearchTrigram.objects.filter(trigram__in=query_grams, entry__kind__in=kinds).values("entry").annotate(hits=Count("trigram")).order_by("-hits", "entry")[:MAX_CANDIDATES]
+    hits = {row["entry"]: row["hits"] for row in candidates}
+    results = []
+    for entry in SearchEntry.objects.filter(pk__in=list(hits)):
+        shared = hits[entry.pk]
+        score = shared / (len(query_grams) + entry.trigram_count - shared)
+        if query in entry.text:
+            score += 2 if entry.text.startswith(query) else 1
+        elif score < SIMILARITY_THRESHOLD:
+            continue
+        results.append({"type": entry.kind, "id": entry.object_id, "title": entry.title, "subtitle": entry.subtitle, "score": round(score, 4)})
+    results.sort(key=lambda hit: (-hit["score"], hit["title"], hit["type"], hit["id"]))
+
+    # Drop entries whose object went away without delete() (e.g. units removed by an owner cascade)
+    existing = {}
+    for kind in {hit["type"] for hit in results}:
+        model = apps.get_model(SEARCH_KINDS[kind]["model"])
+        existing[kind] = set(model.objects.filter(pk__in=[hit["id"] for hit in results if hit["type"] == kind]).values_list("pk", flat=True))
+    return [hit for hit in results if hit["id"] in existing[hit["type"]]][:limit]
@@ -42,3 +42,22 @@ class SuperUserLoginSerializer(serializers.Serializer):
             raise AuthenticationFailed("Invalid credentials or not a superuser")
 
         return user
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """?q= (required), ?type=unit,tenant,owner (any subset, default all) and ?limit=."""
+
+    MAX_LIMIT = 50
+
+    q = serializers.CharField(max_length=200)
+    type = serializers.CharField(required=False)
+    limit = serializers.IntegerField(default=20, min_value=1, max_value=MAX_LIMIT)
+
+    def validate_type(self, value):
+        from apps.core.search import SEARCH_KINDS
+
+        kinds = {kind.strip() for kind in value.split(",") if kind.strip()}
+        unknown = sorted(kinds - set(SEARCH_KINDS))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown type(s): {', '.join(unknown)}. Choose from: {', '.join(SEARCH_KINDS)}.")
+        return sorted(kinds)
@@ -0,0 +1,73 @@
+"""
+Transaction-scoped queue for derived-data side effects of Rent / OccasionalPayments writes.
+
+Writes register what they touched (units, tenants, ledger buckets) instead of recomputing it
+immediately. The queue is flushed once when the surrounding transaction commits, so saving
+500 rents of one unit inside transaction.atomic() recomputes that unit once, not 500 times.
+Outside a transaction (autocommit) the flush runs right away, exactly like before.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+class SideEffectBatch:
+    """Pending work of one transaction; registered with transaction.on_commit and called once."""
+
+    def __init__(self, using):
+        self.using = using
+        self.unit_ids = set()
+        self.tenant_ids = set()
+        self.ledger_buckets = set()
+
+    def __call__(self):
+        from apps.payments.cache import bump_summary_versions
+        from apps.payments.models import UnitMonthlyLedger
+        from apps.tenants.models import Tenant
+        from apps.tenants.utils import sync_tenant_statuses
+        from apps.units.models import Unit
+        from apps.units.utils import sync_unit_statuses
+
+        with transaction.atomic(using=self.using):
+            months_by_unit = {}
+            for unit_id, month in self.ledger_buckets:
+                months_by_unit.setdefault(unit_id, set()).add(month)
+            for unit_id, months in months_by_unit.items():
+                UnitMonthlyLedger.refresh(unit_id, months)
+
+            if self.unit_ids:
+                sync_unit_statuses(Unit.objects.filter(pk__in=self.unit_ids))
+            if self.tenant_ids:
+                sync_tenant_statuses(Tenant.objects.filter(pk__in=self.tenant_ids))
+
+        # Owners of these units are resolved (and bumped) by bump_summary_versions itself
+        bump_summary_versions(unit_ids=self.unit_ids | months_by_unit.keys())
+
+
+def _current_batch(using):
+    """The batch already queued in this transaction (or savepoint), or a new one scheduled on commit."""
+    connection = transaction.get_connection(using)
+    # Django drops on_commit callbacks on rollback, so a batch found here is always still live
+    for _, callback, _ in connection.run_on_commit:
+        if isinstance(callback, SideEffectBatch):
+            return callback
+    batch = SideEffectBatch(using)
+    if connection.in_atomic_block:
+        transaction.on_commit(batch, using=using)
+    return batch
+
+
+def defer_side_effects(units=(), tenants=(), ledger_entries=(), using=DEFAULT_DB_ALIAS):
+    """
+    Queue recomputation of unit status, tenant status and (unit, payment_date) ledger buckets.
+    None ids / entries are ignored. Cached payment summaries of the units (and their owners)
+    are invalidated when the queue is flushed.
+    """
+    from apps.payments.models import UnitMonthlyLedger
+
+    batch = _current_batch(using)
+    batch.unit_ids.update(pk for pk in units if pk is not None)
+    batch.tenant_ids.update(pk for pk in tenants if pk is not None)
+    batch.ledger_buckets.update((unit_id, UnitMonthlyLedger.month_of(value)) for unit_id, value in filter(None, ledger_entries))
+
+    if not transaction.get_connection(using).in_atomic_block:
+        batch()
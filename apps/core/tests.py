@@ -1 +1,135 @@
-# Create your tests here.
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.core.models import City, District, SearchEntry, SearchTrigram, User
+from apps.core.search import matching_ids, search
+from apps.owners.models import Owner
+from apps.rents.models import Rent
+from apps.tenants.models import Review, Tenant
+from apps.units.models import Unit
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "core-tests"}}
+
+
+def create_unit(name, owner, **fields):
+    city, _ = City.objects.get_or_create(name="Cairo")
+    district, _ = District.objects.get_or_create(name="Zamalek", city=city)
+    values = {
+        "city": city,
+        "district": district,
+        "location_url": "https://www.google.com/maps/@30.06,31.22,15z",
+        "location_text": "Zamalek",
+        "type": "apartment",
+        "bedrooms": 2,
+        "bathrooms": 1,
+        "area": 100,
+        "price_per_day": Decimal("100.00"),
+        "lease_start": date(2025, 1, 1),
+        "lease_end": date(2030, 1, 1),
+    }
+    values.update(fields)
+    return Unit.objects.create(name=name, owner=owner, **values)
+
+
+@override_settings(CACHES=LOCMEM)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(email="admin@example.com", password="pw"))
+        with self.captureOnCommitCallbacks(execute=True):
+            owner = Owner.objects.create(full_name="Owner", phone="0100")
+            self.tenant = Tenant.objects.create(full_name="Tenant", phone="0111")
+            unit = create_unit("A-101", owner)
+            self.rent = Rent.objects.create(unit=unit, tenant=self.tenant, rent_start=date(2025, 2, 1), rent_end=date(2025, 2, 10), total_amount=Decimal("900.00"))
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_list_is_not_modified_without_counting_rows(self):
+        etag = self.client.get("/api/rents/")["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.revalidate("/api/rents/", etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any("COUNT(" in query["sql"].upper() for query in queries.captured_queries))
+
+    def test_delete_changes_the_etag(self):
+        etag = self.client.get("/api/rents/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rent.delete()
+        self.assertEqual(self.revalidate("/api/rents/", etag).status_code, 200)
+
+    def test_saving_a_model_without_updated_at_changes_the_etag(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        etag = self.client.get("/api/tenants/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            review.comment = "Quiet"
+            review.save()
+        response = self.revalidate("/api/tenants/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.revalidate("/api/tenants/", response["ETag"]).status_code, 304)
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.owner = Owner.objects.create(full_name="Owner", phone="0100")
+        self.tenant = Tenant.objects.create(full_name="Zoë Hassan", phone="0111", email="zoe@example.com")
+
+    def ids(self, kind, value):
+        return set(matching_ids(kind, value).values_list("object_id", flat=True))
+
+    def test_save_indexes_and_reindexes(self):
+        entry = SearchEntry.objects.get(kind="tenant", object_id=self.tenant.pk)
+        self.assertEqual(entry.text, "zoe hassan 0111 zoe example com")
+        self.assertTrue(SearchTrigram.objects.filter(entry=entry, trigram="has").exists())
+
+        self.tenant.full_name = "Zoë Farouk"
+        self.tenant.save()
+        self.assertEqual(self.ids("tenant", "farouk"), {self.tenant.pk})
+        self.assertEqual(self.ids("tenant", "hassan"), set())
+        self.assertEqual(search("farouk")[0]["id"], self.tenant.pk)
+
+    def test_delete_removes_the_entry(self):
+        tenant_id = self.tenant.pk
+        self.tenant.delete()
+        self.assertFalse(SearchEntry.objects.filter(kind="tenant", object_id=tenant_id).exists())
+        self.assertEqual(search("hassan"), [])
+
+    def test_rebuild_search_index_picks_up_set_based_writes(self):
+        Tenant.objects.filter(pk=self.tenant.pk).update(full_name="Omar Said")
+        self.assertEqual(self.ids("tenant", "omar"), set())
+
+        call_command("rebuild_search_index", "--type", "tenant", stdout=StringIO())
+        self.assertEqual(self.ids("tenant", "omar"), {self.tenant.pk})
+        self.assertEqual(SearchEntry.objects.filter(kind="tenant").count(), 1)
+
+    def test_short_queries_use_the_substring_check_only(self):
+        Tenant.objects.create(full_name="Ola Adel", phone="0222")
+        self.assertEqual(self.ids("tenant", "zo"), {self.tenant.pk})
+        self.assertEqual(self.ids("tenant", "ZOË"), {self.tenant.pk})
+        self.assertEqual(self.ids("tenant", "e h"), {self.tenant.pk})
+        self.assertEqual(len(self.ids("tenant", "a")), 2)
+
+    def test_tenant_search_matches_name_or_rented_unit_name(self):
+        unit = create_unit("Nile Tower", self.owner, location_text="Garden City")
+        other = Tenant.objects.create(full_name="Ola Adel", phone="0222")
+        Rent.objects.create(unit=unit, tenant=other, rent_start=date(2025, 2, 1), rent_end=date(2025, 2, 10), total_amount=Decimal("900.00"))
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser(email="admin@example.com", password="pw"))
+
+        def found(value):
+            return {tenant["id"] for tenant in client.get("/api/tenants/", {"search": value}).json()["results"]}
+
+        self.assertEqual(found("hass"), {self.tenant.pk})
+        self.assertEqual(found("nile"), {other.pk})
+        self.assertEqual(found("0111"), set())
+        self.assertEqual(found("garden"), set())
@@ -2,7 +2,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 
-from .views import CityViewSet, DistrictViewSet, LogoutView, SuperUserLoginView
+from .views import CityViewSet, DistrictViewSet, LogoutView, SearchView, SuperUserLoginView
 
 router = DefaultRouter()
 router.register(r"cities", CityViewSet, basename="city")
@@ -12,5 +12,6 @@ urlpatterns = [
     path("auth/login/", SuperUserLoginView.as_view(), name="superuser-login"),
     path("auth/logout/", LogoutView.as_view(), name="superuser-logout"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/search/", SearchView.as_view(), name="search"),
     path("api/", include(router.urls)),
 ]
@@ -7,7 +7,8 @@ from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.core.models import City, District
-from apps.core.serializers import CitySerializer, DistrictSerializer
+from apps.core.search import search
+from apps.core.serializers import CitySerializer, DistrictSerializer, SearchQuerySerializer
 
 from .serializers import SuperUserLoginSerializer
 
@@ -62,3 +63,18 @@ class DistrictViewSet(ModelViewSet):
         if not serializer.validated_data.get("city"):
             raise serializers.ValidationError({"city": "City is required."})
         serializer.save()
+
+
+class SearchView(APIView):
+    """
+    Ranked search across units, tenants and owners through the trigram index (apps.core.search).
+    GET /api/search/?q=ahm&type=tenant,owner&limit=20
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        return Response(search(query["q"], kinds=query.get("type"), limit=query["limit"]))
@@ -4,6 +4,7 @@ from django.db.models import Sum, F, Value, DecimalField, ExpressionWrapper
 from django.utils import timezone
 
 from apps.inventory.models import Inventory
+from apps.payments.models import UnitMonthlyLedger
 from apps.rents.models import Rent
 from apps.units.models import Unit
 from apps.tenants.models import Tenant
@@ -26,15 +27,13 @@ def get_home_metrics(days: int = 30) -> dict:
     total_units = Unit.objects.count()
     total_units_occupied = Unit.objects.filter(status=Status.OCCUPIED).count()
 
-    # Company revenue (overall) = sum(total_amount * (1 - owner_percentage/100)) over all PAID rents
+    # Company revenue (overall) = sum(total_amount * (1 - owner_percentage/100)) over all PAID rents,
+    # read from the monthly ledger's paid totals instead of the raw rent history
     company_share_expr = ExpressionWrapper(
-        F("total_amount") * (Value(1) - (F("unit__owner_percentage") / Value(100))),
+        F("paid_rent_total") * (Value(1) - (F("unit__owner_percentage") / Value(100))),
         output_field=DecimalField(max_digits=14, decimal_places=2),
     )
-    company_revenue_sum = (
-        Rent.objects.filter(payment_status=PaymentStatus.PAID).aggregate(total=Sum(company_share_expr))["total"]
-        or 0
-    )
+    company_revenue_sum = UnitMonthlyLedger.objects.aggregate(total=Sum(company_share_expr))["total"] or 0
 
     # Pending rents sum (overall)
     pending_sum = (
@@ -78,13 +77,11 @@ def get_stock_metrics() -> dict:
 def get_rental_metrics() -> dict:
     """
     Rental management metrics.
-    - total_collected: sum of total_amount for paid rents
+    - total_collected: sum of total_amount for paid rents (from the monthly ledger)
     - pending: sum for pending rents
     - overdue: sum for overdue rents
     """
-    total_collected_sum = (
-        Rent.objects.filter(payment_status=PaymentStatus.PAID).aggregate(total=Sum("total_amount"))["total"] or 0
-    )
+    total_collected_sum = UnitMonthlyLedger.objects.aggregate(total=Sum("paid_rent_total"))["total"] or 0
     pending_sum = (
         Rent.objects.filter(payment_status=PaymentStatus.PENDING).aggregate(total=Sum("total_amount"))["total"] or 0
     )
@@ -27,5 +27,9 @@ class Inventory(models.Model):
             self.status = "In Stock"
         super().save(*args, **kwargs)
 
+        from apps.notifications.utils import notify_stock
+
+        notify_stock(self)
+
     def __str__(self):
         return f"{self.name} ({self.status})"
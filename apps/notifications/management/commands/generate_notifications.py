@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.utils import check_and_create_notifications
+
+
+class Command(BaseCommand):
+    help = "Create lease-ending and low-stock notifications and delete ones older than 6 months. Run daily."
+
+    def handle(self, *args, **options):
+        check_and_create_notifications()
+        self.stdout.write(self.style.SUCCESS("Generated notifications."))
@@ -11,37 +11,46 @@ from .models import Notification
 LEASE_MESSAGE_TPL = "Lease for unit '{name}' will end on {end}"
 LOW_STOCK_TPL = "Item '{name}' only has {qty} units remaining"
 OUT_OF_STOCK_TPL = "Item '{name}' is out of stock"
+LEASE_WINDOW = timedelta(days=60)
 
 
 def _create_notification_once(message: str) -> None:
     Notification.objects.get_or_create(message=message)
 
 
+def notify_lease_ending(unit, today=None) -> None:
+    """Create the lease-ending notification of a unit whose lease_end is within the next 2 months."""
+    today = today or timezone.now().date()
+    if unit.lease_end and today <= unit.lease_end <= today + LEASE_WINDOW:
+        _create_notification_once(LEASE_MESSAGE_TPL.format(name=unit.name, end=unit.lease_end.isoformat()))
+
+
+def notify_stock(item) -> None:
+    """Create the low / out of stock notification of an inventory item (status is set by Inventory.save())."""
+    if item.status == "Out of Stock" or item.quantity == 0:
+        _create_notification_once(OUT_OF_STOCK_TPL.format(name=item.name))
+    elif item.status == "Low Stock":
+        _create_notification_once(LOW_STOCK_TPL.format(name=item.name, qty=item.quantity))
+
+
 def check_and_create_notifications() -> None:
     """
-    - Find all units whose lease_end is within 2 months from today and create notifications.
+    Daily sweep (`manage.py generate_notifications`); Unit.save and Inventory.save notify as they write.
+    - Find all units whose lease_end is within 2 months from today and create notifications
+      (leases enter the window as days pass, and bulk writes skip save()).
     - Find inventory items with Low Stock or Out of Stock and create notifications.
-    - Delete notifications older than 6 months (monthly cleanup implied by calling this periodically).
+    - Delete notifications older than 6 months.
     Uses get_or_create() to avoid duplicates.
     """
     today = timezone.now().date()
-    in_two_months = today + timedelta(days=60)
 
     # Units with lease ending within next 2 months
-    units_qs = Unit.objects.filter(lease_end__gte=today, lease_end__lte=in_two_months)
-    for unit in units_qs.only("name", "lease_end"):
-        msg = LEASE_MESSAGE_TPL.format(name=unit.name, end=unit.lease_end.isoformat())
-        _create_notification_once(msg)
+    for unit in Unit.objects.filter(lease_end__gte=today, lease_end__lte=today + LEASE_WINDOW).only("name", "lease_end"):
+        notify_lease_ending(unit, today)
 
     # Inventory: low stock or out of stock
-    # Status is set automatically by Inventory.save()
-    low_or_out_qs = Inventory.objects.filter(Q(status="Low Stock") | Q(status="Out of Stock"))
-    for item in low_or_out_qs.only("name", "quantity", "status"):
-        if item.quantity == 0:
-            msg = OUT_OF_STOCK_TPL.format(name=item.name)
-        else:
-            msg = LOW_STOCK_TPL.format(name=item.name, qty=item.quantity)
-        _create_notification_once(msg)
+    for item in Inventory.objects.filter(Q(status="Low Stock") | Q(status="Out of Stock")).only("name", "quantity", "status"):
+        notify_stock(item)
 
     # Cleanup: delete notifications older than 6 months
     six_months_ago = timezone.now() - timedelta(days=6 * 30)
@@ -1,13 +1,22 @@
 from rest_framework.generics import ListAPIView
 
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import HybridPagination
+
 from .models import Notification
 from .serializers import NotificationSerializer
-from .utils import check_and_create_notifications
 
 
-class NotificationListView(ListAPIView):
+class NotificationPagination(HybridPagination):
+    ordering = ("-created_at", "-id")
+
+
+class NotificationListView(ConditionalGetMixin, ListAPIView):
+    # Read-only: notifications are created by unit / inventory writes and the daily
+    # `manage.py generate_notifications` sweep, never on GET
     serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
+    conditional_models = (Notification,)
 
     def get_queryset(self):
-        check_and_create_notifications()
-        return Notification.objects.all().order_by("-created_at")
+        return Notification.objects.all().order_by("-created_at", "-id")
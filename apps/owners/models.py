@@ -3,6 +3,9 @@ from decimal import Decimal
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from apps.core.search import index_saved, remove_objects
+from apps.payments.cache import bump_summary_versions
+
 
 class Owner(models.Model):
     full_name = models.CharField(max_length=255, unique=True)
@@ -23,3 +26,16 @@ class Owner(models.Model):
 
     def __str__(self):
         return self.full_name
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        index_saved("owner", self, kwargs.get("update_fields"))
+        # Owner name is embedded in unit and owner summaries
+        bump_summary_versions(owner_ids=[self.pk], unit_ids=self.units.values_list("id", flat=True))
+
+    def delete(self, *args, **kwargs):
+        owner_id = self.pk
+        result = super().delete(*args, **kwargs)
+        remove_objects("owner", [owner_id])
+        bump_summary_versions(owner_ids=[owner_id])
+        return result
@@ -1,5 +1,6 @@
 from decimal import Decimal
 
+from django.db.models import Sum
 from django.utils import timezone
 from rest_framework import serializers
 
@@ -24,27 +25,26 @@ class OwnerSerializer(serializers.ModelSerializer):
         return obj.units.count()
 
     def get_total_revenue(self, obj: Owner):
-        # Sum of owner's share across all rents for this owner's units
-        from apps.rents.models import Rent
-
-        total = Decimal("0")
-        qs = Rent.objects.filter(unit__owner=obj).select_related("unit")
-        for rent in qs:
-            share = (rent.total_amount * rent.unit.owner_percentage) / Decimal("100")
-            total += share
-        # Normalize to 2 decimal places like money
-        return total.quantize(Decimal("0.01")) if total else Decimal("0.00")
+        # Sum of owner's share across all rents for this owner's units (read from the monthly ledger)
+        return self._owner_rent_share(obj)
 
     def get_monthly_revenue(self, obj: Owner):
         # Current month revenue (owner's share)
-        from apps.rents.models import Rent
+        from apps.payments.utils import start_of_current_month_date
+
+        return self._owner_rent_share(obj, month=start_of_current_month_date())
+
+    def _owner_rent_share(self, obj: Owner, month=None):
+        from apps.payments.models import UnitMonthlyLedger
 
-        now = timezone.now()
+        qs = UnitMonthlyLedger.objects.filter(unit__owner=obj)
+        if month is not None:
+            qs = qs.filter(month=month)
+        # One row per distinct owner_percentage; apply the share in Python to keep Decimal precision
         total = Decimal("0")
-        qs = Rent.objects.filter(unit__owner=obj, created_at__year=now.year, created_at__month=now.month).select_related("unit")
-        for rent in qs:
-            share = (rent.total_amount * rent.unit.owner_percentage) / Decimal("100")
-            total += share
+        for percentage, rent_total in qs.values_list("unit__owner_percentage").annotate(s=Sum("rent_total")).values_list("unit__owner_percentage", "s"):
+            total += ((rent_total or Decimal("0")) * percentage) / Decimal("100")
+        # Normalize to 2 decimal places like money
         return total.quantize(Decimal("0.01")) if total else Decimal("0.00")
 
     def get_units(self, obj: Owner):
@@ -69,15 +69,6 @@ class OwnerSerializer(serializers.ModelSerializer):
                 rent_start = latest_rent.rent_start
                 rent_end = latest_rent.rent_end
 
-            # Cover photo: first image if exists
-            first_image = u.images.first()
-            cover_photo = None
-            if first_image:
-                try:
-                    cover_photo = first_image.image.url
-                except Exception:
-                    cover_photo = str(first_image.image)
-
             data.append(
                 {
                     "id": u.id,
@@ -92,7 +83,8 @@ class OwnerSerializer(serializers.ModelSerializer):
                     "city_name": u.city.name if u.city_id else None,
                     "district_name": u.district.name if u.district_id else None,
                     "location_url": u.location_url,
-                    "cover_photo": cover_photo,
+                    # First image, denormalized on the unit
+                    "cover_photo": u.cover_image_url,
                 }
             )
         return data
@@ -12,7 +12,7 @@ class OwnerListCreateView(generics.ListCreateAPIView):
     search_fields = ["full_name"]
 
     def get_queryset(self):
-        return super().get_queryset().prefetch_related("units__city", "units__district", "units__images")
+        return super().get_queryset().prefetch_related("units__city", "units__district")
 
 
 class OwnerRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
@@ -21,4 +21,4 @@ class OwnerRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = OwnerSerializer
 
     def get_queryset(self):
-        return super().get_queryset().prefetch_related("units__city", "units__district", "units__images")
+        return super().get_queryset().prefetch_related("units__city", "units__district")
@@ -0,0 +1,105 @@
+"""
+Versioned cache for payment summaries.
+
+Every cached summary is keyed by the version counters of the data it depends on
+(a unit, an owner, or the global company-wide counter). Write paths bump those
+counters on commit instead of deleting keys, so stale entries simply stop being
+read and age out through the cache backend's normal eviction.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import date
+from typing import Any, Callable, Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = "summaries"
+GLOBAL_SCOPE = "global"
+# Bumped only by bump_all_summaries(); part of every key
+GENERATION_SCOPE = "generation"
+
+
+def unit_scope(unit_id: int) -> str:
+    return f"unit:{unit_id}"
+
+
+def owner_scope(owner_id: int) -> str:
+    return f"owner:{owner_id}"
+
+
+def _version_key(scope: str) -> str:
+    return f"{KEY_PREFIX}:v:{scope}"
+
+
+def _new_version() -> int:
+    # Clock-based start value: an evicted counter can't restart on a version that was already used
+    return time.time_ns()
+
+
+def _current_versions(scopes: list[str]) -> list[int]:
+    keys = [_version_key(s) for s in scopes]
+    found = cache.get_many(keys)
+    missing = {k: _new_version() for k in keys if k not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [found[k] for k in keys]
+
+
+def _bump_now(scopes: Iterable[str]) -> None:
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+
+
+def bump_summary_versions(unit_ids: Iterable[int | None] = (), owner_ids: Iterable[int | None] = ()) -> None:
+    """
+    Invalidate summaries that depend on these units/owners, plus company-wide ones.
+    Owners of the given units are included. Runs once the current transaction commits.
+    """
+    unit_ids = {u for u in unit_ids if u is not None}
+    owner_ids = {o for o in owner_ids if o is not None}
+
+    def bump():
+        if unit_ids:
+            from apps.units.models import Unit
+
+            owner_ids.update(Unit.objects.filter(pk__in=unit_ids).values_list("owner_id", flat=True))
+        _bump_now({GLOBAL_SCOPE} | {unit_scope(u) for u in unit_ids} | {owner_scope(o) for o in owner_ids})
+
+    transaction.on_commit(bump)
+
+
+def bump_all_summaries() -> None:
+    """Invalidate every cached summary (e.g. after a ledger rebuild)."""
+    transaction.on_commit(lambda: _bump_now([GENERATION_SCOPE]))
+
+
+def summary_version_token(scopes: list[str]) -> str:
+    """
+    Today's date plus the current version of every scope. Changes whenever a summary built
+    over these scopes could change; also usable as an HTTP validator.
+    """
+    scopes = [GENERATION_SCOPE, *scopes]
+    versions = _current_versions(scopes)
+    return ":".join([date.today().isoformat(), *(f"{s}={v}" for s, v in zip(scopes, versions))])
+
+
+def cached_summary(name: str, scopes: list[str], build: Callable[[], Any], *params: Any) -> Any:
+    """
+    Return build() cached under the current versions of `scopes`.
+    The key also carries today's date (this/last month windows roll over) and any extra params.
+    """
+    key = ":".join([KEY_PREFIX, name, *map(str, params), summary_version_token(scopes)])
+
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value)
+    return value
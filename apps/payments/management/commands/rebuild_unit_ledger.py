@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.payments.cache import bump_all_summaries
+from apps.payments.models import UnitMonthlyLedger
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-unit monthly ledger from the full Rent and OccasionalPayments history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--unit", type=int, action="append", dest="unit_ids", help="Only rebuild this unit (repeatable).")
+
+    def handle(self, *args, **options):
+        rows = UnitMonthlyLedger.rebuild(unit_ids=options["unit_ids"])
+        bump_all_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt unit monthly ledger: {rows} rows."))
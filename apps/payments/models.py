@@ -1,10 +1,13 @@
-from datetime import date
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
-from config.choices import OccasionalPaymentCategory, PaymentMethod
+from apps.core.side_effects import defer_side_effects
+from apps.payments.cache import bump_summary_versions
+from config.choices import OccasionalPaymentCategory, PaymentMethod, PaymentStatus
 
 
 # occi
@@ -39,6 +42,20 @@ class OccasionalPayments(models.Model):
         cat = self.category if self.category else "Unknown"
         return f"OccasionalPayment[{cat}] - {unit_name} - {self.amount}"
 
+    def save(self, *args, **kwargs):
+        # Remember the previous ledger bucket so moving a payment refreshes both months
+        previous = None
+        if self.pk is not None:
+            previous = type(self).objects.filter(pk=self.pk).values_list("unit_id", "payment_date").first()
+        super().save(*args, **kwargs)
+        defer_side_effects(ledger_entries=[previous, (self.unit_id, self.payment_date)])
+
+    def delete(self, *args, **kwargs):
+        entry = (self.unit_id, self.payment_date)
+        result = super().delete(*args, **kwargs)
+        defer_side_effects(ledger_entries=[entry])
+        return result
+
 
 # what we pay to Owner
 class OwnerPayment(models.Model):
@@ -53,3 +70,190 @@ class OwnerPayment(models.Model):
     def __str__(self):
         owner_name = getattr(self.owner, "full_name", str(self.owner_id))
         return f"OwnerPayment {owner_name} - {self.amount} on {self.date:%Y-%m-%d}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_summary_versions(owner_ids=[self.owner_id])
+
+    def delete(self, *args, **kwargs):
+        owner_id = self.owner_id
+        result = super().delete(*args, **kwargs)
+        bump_summary_versions(owner_ids=[owner_id])
+        return result
+
+
+# monthly per-unit rollup of Rent / OccasionalPayments, kept in sync by their save/delete paths
+class UnitMonthlyLedger(models.Model):
+    unit = models.ForeignKey("units.Unit", related_name="monthly_ledger", on_delete=models.CASCADE)
+    # First day of the month the money was dated in; null collects rows without a payment date
+    month = models.DateField(blank=True, null=True)
+    rent_count = models.PositiveIntegerField(default=0)
+    rent_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    paid_rent_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    occasional_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    owner_share = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    company_share = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["unit_id", "month"]
+        constraints = [
+            models.UniqueConstraint(fields=["unit", "month"], name="unique_unit_monthly_ledger"),
+        ]
+
+    def __str__(self):
+        month = f"{self.month:%Y-%m}" if self.month else "undated"
+        return f"Ledger {self.unit_id} {month}: rent={self.rent_total} occasional={self.occasional_total}"
+
+    @staticmethod
+    def month_of(value):
+        """Return the ledger bucket (first day of month) for a date/datetime, or None."""
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            value = timezone.localtime(value) if timezone.is_aware(value) else value
+            value = value.date()
+        return value.replace(day=1)
+
+    @staticmethod
+    def split_shares(rent_total, occasional_total, owner_percentage):
+        """Owner/company split of the net (rent - occasional) using the unit's owner_percentage."""
+        net = rent_total - occasional_total
+        owner_share = (net * (owner_percentage or Decimal("0")) / Decimal("100")).quantize(Decimal("0.01"))
+        return owner_share, (net - owner_share).quantize(Decimal("0.01"))
+
+    @classmethod
+    def refresh(cls, unit_id, months):
+        """
+        Recompute the given (unit, month) buckets from the raw transaction tables.
+        Each bucket only scans that unit's rows for that month; empty buckets are removed.
+        """
+        from apps.rents.models import Rent
+        from apps.units.models import Unit
+
+        owner_percentage = Unit.objects.filter(pk=unit_id).values_list("owner_percentage", flat=True).first()
+        if owner_percentage is None:
+            # Unit is gone; its ledger rows were cascaded with it
+            return
+
+        for month in set(months):
+            rents = Rent.objects.filter(unit_id=unit_id)
+            occasional = OccasionalPayments.objects.filter(unit_id=unit_id)
+            if month is None:
+                rents = rents.filter(payment_date__isnull=True)
+                occasional = occasional.filter(payment_date__isnull=True)
+            else:
+                next_month = (month + timedelta(days=32)).replace(day=1)
+                start_dt = timezone.make_aware(datetime.combine(month, time.min))
+                end_dt = timezone.make_aware(datetime.combine(next_month, time.min))
+                rents = rents.filter(payment_date__gte=start_dt, payment_date__lt=end_dt)
+                occasional = occasional.filter(payment_date__gte=month, payment_date__lt=next_month)
+
+            rent_agg = rents.aggregate(
+                count=models.Count("id"),
+                total=models.Sum("total_amount"),
+                paid=models.Sum("total_amount", filter=models.Q(payment_status=PaymentStatus.PAID)),
+            )
+            occ_total = occasional.aggregate(total=models.Sum("amount"))["total"]
+
+            if not rent_agg["count"] and occ_total is None:
+                cls.objects.filter(unit_id=unit_id, month=month).delete()
+                continue
+
+            rent_total = rent_agg["total"] or Decimal("0.00")
+            occ_total = occ_total or Decimal("0.00")
+            owner_share, company_share = cls.split_shares(rent_total, occ_total, owner_percentage)
+            cls.objects.update_or_create(
+                unit_id=unit_id,
+                month=month,
+                defaults={
+                    "rent_count": rent_agg["count"],
+                    "rent_total": rent_total,
+                    "paid_rent_total": rent_agg["paid"] or Decimal("0.00"),
+                    "occasional_total": occ_total,
+                    "owner_share": owner_share,
+                    "company_share": company_share,
+                },
+            )
+
+    @classmethod
+    def refresh_entries(cls, *entries):
+        """Refresh the buckets touched by `(unit_id, payment_date)` pairs; None entries are skipped."""
+        months_by_unit = {}
+        for entry in entries:
+            if entry is None:
+                continue
+            unit_id, value = entry
+            months_by_unit.setdefault(unit_id, set()).add(cls.month_of(value))
+        for unit_id, months in months_by_unit.items():
+            cls.refresh(unit_id, months)
+
+    @classmethod
+    def reprice(cls, unit_id, owner_percentage):
+        """Re-split owner/company shares of a unit's buckets after its owner_percentage changed."""
+        rows = list(cls.objects.filter(unit_id=unit_id))
+        for row in rows:
+            row.owner_share, row.company_share = cls.split_shares(row.rent_total, row.occasional_total, owner_percentage)
+        cls.objects.bulk_update(rows, ["owner_share", "company_share"])
+
+    @classmethod
+    def rebuild(cls, unit_ids=None, batch_size=1000):
+        """
+        Drop and rebuild ledger rows from the full Rent / OccasionalPayments history.
+        Uses one grouped query per table; pass `unit_ids` to limit the rebuild.
+        Returns the number of ledger rows written.
+        """
+        from django.db.models.functions import TruncMonth
+
+        from apps.rents.models import Rent
+        from apps.units.models import Unit
+
+        units = Unit.objects.all()
+        rents = Rent.objects.all()
+        occasional = OccasionalPayments.objects.all()
+        if unit_ids is not None:
+            units = units.filter(pk__in=unit_ids)
+            rents = rents.filter(unit_id__in=unit_ids)
+            occasional = occasional.filter(unit_id__in=unit_ids)
+        perc_map = dict(units.values_list("id", "owner_percentage"))
+
+        buckets = {}
+
+        def bucket(unit_id, month):
+            return buckets.setdefault(
+                (unit_id, month),
+                {"rent_count": 0, "rent_total": Decimal("0.00"), "paid_rent_total": Decimal("0.00"), "occasional_total": Decimal("0.00")},
+            )
+
+        rent_rows = (
+            rents.annotate(bucket_month=TruncMonth("payment_date", output_field=models.DateField()))
+            .values("unit_id", "bucket_month")
+            .annotate(
+                count=models.Count("id"),
+                total=models.Sum("total_amount"),
+                paid=models.Sum("total_amount", filter=models.Q(payment_status=PaymentStatus.PAID)),
+            )
+            .order_by()
+        )
+        for r in rent_rows:
+            b = bucket(r["unit_id"], r["bucket_month"])
+            b["rent_count"] = r["count"]
+            b["rent_total"] = r["total"] or Decimal("0.00")
+            b["paid_rent_total"] = r["paid"] or Decimal("0.00")
+
+        occ_rows = occasional.annotate(bucket_month=TruncMonth("payment_date")).values("unit_id", "bucket_month").annotate(total=models.Sum("amount")).order_by()
+        for r in occ_rows:
+            bucket(r["unit_id"], r["bucket_month"])["occasional_total"] = r["total"] or Decimal("0.00")
+
+        ledger_rows = []
+        for (unit_id, month), values in buckets.items():
+            owner_share, company_share = cls.split_shares(values["rent_total"], values["occasional_total"], perc_map.get(unit_id))
+            ledger_rows.append(cls(unit_id=unit_id, month=month, owner_share=owner_share, company_share=company_share, **values))
+
+        with transaction.atomic():
+            stale = cls.objects.all()
+            if unit_ids is not None:
+                stale = stale.filter(unit_id__in=unit_ids)
+            stale.delete()
+            cls.objects.bulk_create(ledger_rows, batch_size=batch_size)
+        return len(ledger_rows)
@@ -1,6 +1,12 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
 from rest_framework import serializers
 
+from apps.owners.models import Owner
 from apps.payments import utils as pay_utils
+from apps.payments.cache import bump_summary_versions
 from apps.payments.models import OccasionalPayments, OwnerPayment
 
 
@@ -90,6 +96,81 @@ class OwnerPaymentCreateSerializer(serializers.ModelSerializer):
         return OwnerPayment.objects.create(owner=owner, amount=amount, notes=notes)
 
 
+class OwnerBulkPayoutItemSerializer(serializers.Serializer):
+    owner = serializers.IntegerField(min_value=1)
+    amount_paid = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal("0.01"))
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class OwnerBulkPayoutSerializer(serializers.Serializer):
+    """
+    Month-end payouts in one request: either an explicit `payouts` list, or
+    `pay_outstanding` to pay every owner (optionally only `owners`) their current still_need_to_pay.
+    All payouts are written together with bulk_create; create() returns the created OwnerPayment rows.
+    """
+
+    MAX_PAYOUTS = 1000
+
+    payouts = OwnerBulkPayoutItemSerializer(many=True, required=False)
+    pay_outstanding = serializers.BooleanField(default=False)
+    owners = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    # Note stored on payouts created by pay_outstanding
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_payouts(self, value):
+        if len(value) > self.MAX_PAYOUTS:
+            raise serializers.ValidationError(f"At most {self.MAX_PAYOUTS} payouts per request.")
+        return value
+
+    def validate(self, attrs):
+        payouts = attrs.get("payouts")
+        owner_ids = attrs.get("owners")
+        if attrs["pay_outstanding"] == bool(payouts):
+            raise serializers.ValidationError("Provide either a non-empty `payouts` list or `pay_outstanding: true`, not both.")
+        if payouts and owner_ids:
+            raise serializers.ValidationError({"owners": "Only used together with `pay_outstanding`."})
+
+        # Every referenced owner is checked with a single query
+        requested = [p["owner"] for p in payouts] if payouts else owner_ids or []
+        existing = set(Owner.objects.filter(pk__in=requested).values_list("pk", flat=True))
+        if payouts:
+            seen = set()
+            errors = []
+            for item in payouts:
+                if item["owner"] not in existing:
+                    errors.append({"owner": [f"Owner {item['owner']} does not exist."]})
+                elif item["owner"] in seen:
+                    errors.append({"owner": [f"Owner {item['owner']} appears more than once."]})
+                else:
+                    errors.append({})
+                seen.add(item["owner"])
+            if any(errors):
+                raise serializers.ValidationError({"payouts": errors})
+        else:
+            missing = sorted(set(requested) - existing)
+            if missing:
+                raise serializers.ValidationError({"owners": [f"Owner {pk} does not exist." for pk in missing]})
+        return attrs
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            if validated_data["pay_outstanding"]:
+                # Lock the owners being paid so two concurrent pay-all calls can't pay the same balance twice
+                owners_qs = Owner.objects.select_for_update().order_by("pk")
+                if validated_data.get("owners"):
+                    owners_qs = owners_qs.filter(pk__in=validated_data["owners"])
+                balances = pay_utils.calculate_owners_payment_summaries(owners_qs)
+                notes = validated_data.get("notes")
+                rows = [OwnerPayment(owner_id=owner_id, amount=summary["still_need_to_pay"], notes=notes) for owner_id, summary in balances.items() if summary["still_need_to_pay"] > 0]
+            else:
+                rows = [OwnerPayment(owner_id=item["owner"], amount=item["amount_paid"], notes=item.get("notes")) for item in validated_data["payouts"]]
+
+            payments = OwnerPayment.objects.bulk_create(rows)
+            # bulk_create skips OwnerPayment.save, so invalidate the cached summaries here
+            bump_summary_versions(owner_ids={p.owner_id for p in payments})
+        return payments
+
+
 # New: read serializer for payout history
 class OwnerPaymentReadSerializer(serializers.ModelSerializer):
     class Meta:
@@ -118,7 +199,9 @@ class OwnerUnitBreakdownSerializer(serializers.Serializer):
     owner_total_this_month = serializers.DecimalField(max_digits=14, decimal_places=2)
 
 
-class OwnerPaymentSummarySerializer(serializers.Serializer):
+class OwnerPayoutSummarySerializer(serializers.Serializer):
+    """Owner totals without the per-unit breakdown; one row of the all-owners payout sheet."""
+
     owner_id = serializers.IntegerField()
     owner_name = serializers.CharField()
 
@@ -138,6 +221,8 @@ class OwnerPaymentSummarySerializer(serializers.Serializer):
     paid_to_owner_total = serializers.DecimalField(max_digits=14, decimal_places=2)
     still_need_to_pay = serializers.DecimalField(max_digits=14, decimal_places=2)
 
+
+class OwnerPaymentSummarySerializer(OwnerPayoutSummarySerializer):
     units = OwnerUnitBreakdownSerializer(many=True)
 
     # New: embed payout history
@@ -163,3 +248,64 @@ class UnitPaymentSummarySerializer(serializers.Serializer):
 
     company_total_this_month = serializers.DecimalField(max_digits=14, decimal_places=2)
     company_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+# --- Arbitrary period / time-series ---
+MAX_SERIES_PERIODS = 1000
+
+
+class PaymentPeriodQuerySerializer(serializers.Serializer):
+    """Validates ?from=YYYY-MM-DD&to=YYYY-MM-DD&bucket=day|week|month|quarter|year."""
+
+    bucket = serializers.ChoiceField(choices=list(pay_utils.SERIES_BUCKETS), default="month")
+
+    def get_fields(self):
+        # `from` is a Python keyword, so the date fields are declared here
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField()
+        fields["to"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        attrs.setdefault("to", date.today())
+        if attrs["to"] < attrs["from"]:
+            raise serializers.ValidationError({"to": "End date cannot be earlier than start date."})
+        try:
+            pay_utils.next_period_start(pay_utils.period_start(attrs["to"], attrs["bucket"]), attrs["bucket"])
+        except (OverflowError, ValueError):
+            raise serializers.ValidationError({"to": "The last period of this range would run past 9999-12-31; use an earlier end date."})
+        periods = pay_utils.count_periods(attrs["from"], attrs["to"], attrs["bucket"])
+        if periods > MAX_SERIES_PERIODS:
+            raise serializers.ValidationError({"bucket": f"Range spans {periods} periods; use a larger bucket (max {MAX_SERIES_PERIODS})."})
+        return attrs
+
+
+class PaymentPeriodFiguresSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_occasional = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_after_occasional = serializers.DecimalField(max_digits=14, decimal_places=2)
+    owner_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    company_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class PaymentSeriesSerializer(serializers.Serializer):
+    # Scope (present depending on unit / owner / company endpoint)
+    unit_id = serializers.IntegerField(required=False)
+    unit_name = serializers.CharField(required=False)
+    owner_id = serializers.IntegerField(required=False)
+    owner_name = serializers.CharField(required=False)
+    owner_percentage = serializers.DecimalField(max_digits=5, decimal_places=4, required=False)
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    bucket = serializers.CharField()
+
+    # Range totals (sum of the series)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_occasional = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_after_occasional = serializers.DecimalField(max_digits=14, decimal_places=2)
+    owner_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    company_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+    series = PaymentPeriodFiguresSerializer(many=True)
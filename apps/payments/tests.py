@@ -1 +1,124 @@
-# Create your tests here.
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.core.models import City, District, User
+from apps.owners.models import Owner
+from apps.payments.cache import GLOBAL_SCOPE, bump_summary_versions, cached_summary, owner_scope, summary_version_token, unit_scope
+from apps.payments.models import OccasionalPayments
+from apps.payments.serializers import MAX_SERIES_PERIODS, PaymentPeriodQuerySerializer
+from apps.payments.utils import count_periods, iter_periods
+from apps.units.models import Unit
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "payments-tests"}}
+
+
+@override_settings(CACHES=LOCMEM)
+class SummaryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        city = City.objects.create(name="Cairo")
+        district = District.objects.create(name="Zamalek", city=city)
+        self.owner = Owner.objects.create(full_name="Owner", phone="0100")
+        other_owner = Owner.objects.create(full_name="Other owner", phone="0101")
+        unit_fields = {
+            "city": city,
+            "district": district,
+            "location_url": "https://www.google.com/maps/@30.06,31.22,15z",
+            "location_text": "Zamalek",
+            "bedrooms": 2,
+            "bathrooms": 1,
+            "area": 100,
+            "price_per_day": Decimal("100.00"),
+            "owner_percentage": Decimal("50.00"),
+            "type": "apartment",
+            "lease_start": date(2025, 1, 1),
+            "lease_end": date(2030, 1, 1),
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.unit = Unit.objects.create(name="A-101", owner=self.owner, **unit_fields)
+            self.other_unit = Unit.objects.create(name="B-201", owner=other_owner, **unit_fields)
+
+    def test_write_bumps_versions_of_unit_owner_and_global_scopes(self):
+        scopes = [unit_scope(self.unit.pk), owner_scope(self.owner.pk), GLOBAL_SCOPE]
+        before = {scope: summary_version_token([scope]) for scope in scopes}
+        untouched = summary_version_token([unit_scope(self.other_unit.pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_summary_versions(unit_ids=[self.unit.pk])
+
+        for scope in scopes:
+            self.assertNotEqual(summary_version_token([scope]), before[scope], scope)
+        self.assertEqual(summary_version_token([unit_scope(self.other_unit.pk)]), untouched)
+
+    def test_bump_waits_for_commit(self):
+        token = summary_version_token([unit_scope(self.unit.pk)])
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            bump_summary_versions(unit_ids=[self.unit.pk])
+        self.assertEqual(summary_version_token([unit_scope(self.unit.pk)]), token)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_cached_read_is_invalidated_by_a_write(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {"total": OccasionalPayments.objects.filter(unit=self.unit).count()}
+
+        self.assertEqual(cached_summary("test", [unit_scope(self.unit.pk)], build), {"total": 0})
+        self.assertEqual(cached_summary("test", [unit_scope(self.unit.pk)], build), {"total": 0})
+        self.assertEqual(len(builds), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OccasionalPayments.objects.create(unit=self.unit, category="water", amount=Decimal("50.00"), payment_method="cash", payment_date=date.today())
+
+        self.assertEqual(cached_summary("test", [unit_scope(self.unit.pk)], build), {"total": 1})
+        self.assertEqual(len(builds), 2)
+
+    def test_summary_endpoint_serves_fresh_data_and_etag_after_a_write(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser(email="admin@example.com", password="pw"))
+        url = f"/api/all/payments/unit/{self.unit.pk}/"
+
+        first = client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OccasionalPayments.objects.create(unit=self.unit, category="water", amount=Decimal("50.00"), payment_method="cash", payment_date=date.today())
+
+        second = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertNotEqual(second.json(), first.json())
+
+
+class PaymentPeriodTests(SimpleTestCase):
+    def test_count_periods_matches_iter_periods(self):
+        ranges = [(date(2024, 1, 31), date(2024, 1, 31)), (date(2023, 12, 30), date(2025, 3, 2)), (date(2020, 2, 29), date(2024, 2, 28))]
+        for date_from, date_to in ranges:
+            for bucket in ("day", "week", "month", "quarter", "year"):
+                with self.subTest(date_from=date_from, date_to=date_to, bucket=bucket):
+                    self.assertEqual(count_periods(date_from, date_to, bucket), len(list(iter_periods(date_from, date_to, bucket))))
+
+    def validate(self, **params):
+        serializer = PaymentPeriodQuerySerializer(data=params)
+        return serializer.is_valid(), serializer.errors
+
+    def test_too_many_periods_is_rejected(self):
+        date_to = date(2025, 1, 1)
+        valid, errors = self.validate(**{"from": (date_to - timedelta(days=MAX_SERIES_PERIODS)).isoformat(), "to": date_to.isoformat(), "bucket": "day"})
+        self.assertFalse(valid)
+        self.assertIn("bucket", errors)
+        valid, _ = self.validate(**{"from": (date_to - timedelta(days=MAX_SERIES_PERIODS - 1)).isoformat(), "to": date_to.isoformat(), "bucket": "day"})
+        self.assertTrue(valid)
+
+    def test_range_running_past_date_max_is_rejected(self):
+        for bucket, date_from in (("day", "9999-12-01"), ("month", "9999-01-01"), ("year", "9990-01-01")):
+            with self.subTest(bucket=bucket):
+                valid, errors = self.validate(**{"from": date_from, "to": "9999-12-31", "bucket": bucket})
+                self.assertFalse(valid)
+                self.assertIn("to", errors)
@@ -1,11 +1,18 @@
 from django.urls import path
 
 from apps.payments.views import (
+    AllOwnersPaymentSummaryView,
+    CompanyPaymentSeriesView,
     CompanyPaymentSummaryView,
+    OccasionalPaymentExportView,
+    OwnerBulkPayoutView,
     OwnerPaymentCreateView,
+    OwnerPaymentExportView,
+    OwnerPaymentSeriesView,
     OwnerPaymentSummaryView,
     UnitPaymentDetailView,
     UnitPaymentListCreateView,
+    UnitPaymentSeriesView,
     UnitPaymentSummaryView,
 )
 
@@ -27,11 +34,21 @@ urlpatterns = [
         OwnerPaymentSummaryView.as_view(),
         name="owner-payments-summary",
     ),
+    path(
+        "all/payments/owners/",
+        AllOwnersPaymentSummaryView.as_view(),
+        name="all-owners-payments-summary",
+    ),
     path(
         "payments/owner/<int:owner_id>/pay/",
         OwnerPaymentCreateView.as_view(),
         name="owner-payments-create",
     ),
+    path(
+        "payments/owners/pay/",
+        OwnerBulkPayoutView.as_view(),
+        name="owner-payments-bulk-create",
+    ),
     path(
         "all/payments/unit/<int:unit_id>/",
         UnitPaymentSummaryView.as_view(),
@@ -43,4 +60,31 @@ urlpatterns = [
         CompanyPaymentSummaryView.as_view(),
         name="company-payments-summary",
     ),
+    # Streaming exports (CSV / NDJSON)
+    path(
+        "payments/export/occasional/",
+        OccasionalPaymentExportView.as_view(),
+        name="occasional-payments-export",
+    ),
+    path(
+        "payments/export/owner-payouts/",
+        OwnerPaymentExportView.as_view(),
+        name="owner-payments-export",
+    ),
+    # Arbitrary period summaries split into day/week/month/quarter/year buckets
+    path(
+        "all/payments/unit/<int:unit_id>/series/",
+        UnitPaymentSeriesView.as_view(),
+        name="unit-payments-series",
+    ),
+    path(
+        "all/payments/owner/<int:owner_id>/series/",
+        OwnerPaymentSeriesView.as_view(),
+        name="owner-payments-series",
+    ),
+    path(
+        "all/payments/me/series/",
+        CompanyPaymentSeriesView.as_view(),
+        name="company-payments-series",
+    ),
 ]
@@ -2,19 +2,31 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Optional, Tuple
 
-from django.db.models import QuerySet, Sum
+from django.db.models import DateField, Q, QuerySet, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek, TruncYear
 from django.utils import timezone
 
 from apps.owners.models import Owner
-from apps.payments.models import OccasionalPayments, OwnerPayment
+from apps.payments.cache import cached_summary, unit_scope
+from apps.payments.models import OccasionalPayments, OwnerPayment, UnitMonthlyLedger
 from apps.rents.models import Rent
 from apps.units.models import Unit
 
 # Common Decimal quantization constants (no behavior change)
 TWO_PLACES = Decimal("0.01")
 FOUR_PLACES = Decimal("0.0001")
+ZERO = Decimal("0.00")
+
+# Time-series bucket sizes -> database truncation function
+SERIES_BUCKETS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+    "quarter": TruncQuarter,
+    "year": TruncYear,
+}
 
 
 def start_of_current_month_datetime() -> datetime:
@@ -28,6 +40,14 @@ def start_of_current_month_date() -> date:
     return date.today().replace(day=1)
 
 
+def _previous_month_filter() -> Q:
+    """payment_date within the previous calendar month."""
+    first_day_this_month = date.today().replace(day=1)
+    last_day_prev_month = first_day_this_month - timedelta(days=1)
+    first_day_prev_month = last_day_prev_month.replace(day=1)
+    return Q(payment_date__gte=first_day_prev_month, payment_date__lte=last_day_prev_month)
+
+
 def unit_payments_summary(unit_id: int) -> dict:
     """
     Existing helper retained: totals for occasional payments only.
@@ -37,146 +57,192 @@ def unit_payments_summary(unit_id: int) -> dict:
       - last_month_qs: QuerySet[OccasionalPayments]
     """
     qs: QuerySet[OccasionalPayments] = OccasionalPayments.objects.filter(unit_id=unit_id)
+    last_month_filter = _previous_month_filter()
 
-    agg_all = qs.aggregate(total_all=Sum("amount"))
-    total_all = agg_all.get("total_all") or Decimal("0.00")
-
-    # Previous calendar month range
-    today = date.today()
-    first_day_this_month = today.replace(day=1)
-    last_day_prev_month = first_day_this_month - timedelta(days=1)
-    first_day_prev_month = last_day_prev_month.replace(day=1)
-
-    last_month_qs = qs.filter(payment_date__gte=first_day_prev_month, payment_date__lte=last_day_prev_month)
-
-    agg_last = last_month_qs.aggregate(total_last=Sum("amount"))
-    total_last = agg_last.get("total_last") or Decimal("0.00")
+    # Both totals in a single conditional aggregate
+    agg = qs.aggregate(total_all=Sum("amount"), total_last=Sum("amount", filter=last_month_filter))
 
     return {
-        "total_occasional_payment": total_all,
-        "total_occasional_payment_last_month": total_last,
-        "last_month_qs": last_month_qs.order_by("id"),
+        "total_occasional_payment": agg.get("total_all") or ZERO,
+        "total_occasional_payment_last_month": agg.get("total_last") or ZERO,
+        "last_month_qs": qs.filter(last_month_filter).order_by("id"),
     }
 
 
-# --- Analytics helpers ---
-
-
-def calculate_owner_payment_summary(owner_id: int) -> dict:
+def units_payments_summaries(unit_ids) -> Dict[int, dict]:
     """
-    Build per-owner payment summary.
-    Payload keys (unchanged):
-      owner_id, owner_name, total_this_month, total, total_occasional_this_month,
-      total_occasional, total_after_occasional_this_month, total_after_occasional,
-      owner_total_this_month, owner_total, paid_to_owner_total, still_need_to_pay, units
+    unit_payments_summary for many units in two queries (grouped totals + last month's rows).
+    Returns {unit_id: {total_occasional_payment, total_occasional_payment_last_month, last_month_payments: [OccasionalPayments]}}
+    with an entry for every requested unit.
     """
-    owner = Owner.objects.get(pk=owner_id)
-    start_dt = start_of_current_month_datetime()
-    start_d = start_of_current_month_date()
-
-    units_qs = Unit.objects.filter(owner=owner).only("id", "name", "owner_percentage")
-    unit_ids = list(units_qs.values_list("id", flat=True))
+    unit_ids = list(unit_ids)
+    last_month_filter = _previous_month_filter()
+    summaries = {uid: {"total_occasional_payment": ZERO, "total_occasional_payment_last_month": ZERO, "last_month_payments": []} for uid in unit_ids}
+    if not unit_ids:
+        return summaries
 
-    # Totals before (rent) and occasional
-    total_before_all_time = Rent.objects.filter(unit_id__in=unit_ids).aggregate(total=Sum("total_amount")).get("total") or Decimal("0.00")
-    total_before_this_month = Rent.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_dt).aggregate(total=Sum("total_amount")).get("total") or Decimal("0.00")
+    qs = OccasionalPayments.objects.filter(unit_id__in=unit_ids)
+    totals = qs.values("unit_id").annotate(total_all=Sum("amount"), total_last=Sum("amount", filter=last_month_filter)).order_by()
+    for row in totals:
+        summaries[row["unit_id"]]["total_occasional_payment"] = row["total_all"] or ZERO
+        summaries[row["unit_id"]]["total_occasional_payment_last_month"] = row["total_last"] or ZERO
+    for payment in qs.filter(last_month_filter).order_by("unit_id", "id"):
+        summaries[payment.unit_id]["last_month_payments"].append(payment)
+    return summaries
 
-    total_occasional_all_time = OccasionalPayments.objects.filter(unit_id__in=unit_ids).aggregate(total=Sum("amount")).get("total") or Decimal("0.00")
-    total_occasional_this_month = OccasionalPayments.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_d).aggregate(total=Sum("amount")).get("total") or Decimal("0.00")
 
-    total_after_all_time = total_before_all_time - total_occasional_all_time
-    total_after_this_month = total_before_this_month - total_occasional_this_month
+# --- Aggregation engine ---
 
-    # Per-unit grouped aggregates (all-time and this month) for detailed breakdown
-    rents_by_unit_all = {uid: amt or Decimal("0.00") for uid, amt in (Rent.objects.filter(unit_id__in=unit_ids).values_list("unit_id").annotate(s=Sum("total_amount")).values_list("unit_id", "s"))}
-    rents_by_unit_month = {
-        uid: amt or Decimal("0.00")
-        for uid, amt in (Rent.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_dt).values_list("unit_id").annotate(s=Sum("total_amount")).values_list("unit_id", "s"))
-    }
-    occ_by_unit_all = {
-        uid: amt or Decimal("0.00") for uid, amt in (OccasionalPayments.objects.filter(unit_id__in=unit_ids).values_list("unit_id").annotate(s=Sum("amount")).values_list("unit_id", "s"))
-    }
-    occ_by_unit_month = {
-        uid: amt or Decimal("0.00")
-        for uid, amt in (OccasionalPayments.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_d).values_list("unit_id").annotate(s=Sum("amount")).values_list("unit_id", "s"))
-    }
 
-    unit_rows = []
-    owner_total_all_time = Decimal("0.00")
-    owner_total_this_month = Decimal("0.00")
+def aggregate_unit_totals(units: QuerySet[Unit]) -> Dict[int, Dict[str, Optional[Decimal]]]:
+    """
+    Collect all-time and current-month rent/occasional totals for every unit in `units`.
+    Reads the monthly ledger (UnitMonthlyLedger) with one grouped conditional aggregate,
+    regardless of how many units are included. `units` is used as a subquery.
 
-    for u in units_qs:
-        before_all = rents_by_unit_all.get(u.id, Decimal("0.00"))
-        before_m = rents_by_unit_month.get(u.id, Decimal("0.00"))
-        occ_all = occ_by_unit_all.get(u.id, Decimal("0.00"))
-        occ_m = occ_by_unit_month.get(u.id, Decimal("0.00"))
-        after_all = before_all - occ_all
-        after_m = before_m - occ_m
-        frac = (u.owner_percentage or Decimal("0")) / Decimal("100")
-        o_all = (after_all * frac).quantize(TWO_PLACES)
-        o_m = (after_m * frac).quantize(TWO_PLACES)
-
-        unit_rows.append(
-            {
-                "unit_id": u.id,
-                "unit_name": u.name,
-                "owner_percentage": frac.quantize(FOUR_PLACES),
-                "total": before_all.quantize(TWO_PLACES),
-                "total_this_month": before_m.quantize(TWO_PLACES),
-                "total_occasional": occ_all.quantize(TWO_PLACES),
-                "total_occasional_this_month": occ_m.quantize(TWO_PLACES),
-                "total_after_occasional": after_all.quantize(TWO_PLACES),
-                "total_after_occasional_this_month": after_m.quantize(TWO_PLACES),
-                "owner_total": o_all,
-                "owner_total_this_month": o_m,
-            }
+    Returns {unit_id: {total, total_this_month, total_occasional, total_occasional_this_month}}.
+    A rent value is None when the unit has no rents in that window (callers decide how to treat it);
+    units without any rent or occasional payment are absent from the mapping.
+    """
+    this_month = Q(month__gte=start_of_current_month_date())
+
+    rows = (
+        UnitMonthlyLedger.objects.filter(unit_id__in=units.values("pk"))
+        .values("unit_id")
+        .annotate(
+            rents=Sum("rent_count"),
+            rents_this_month=Sum("rent_count", filter=this_month),
+            total=Sum("rent_total"),
+            total_this_month=Sum("rent_total", filter=this_month),
+            total_occasional=Sum("occasional_total"),
+            total_occasional_this_month=Sum("occasional_total", filter=this_month),
         )
-        owner_total_all_time += o_all
-        owner_total_this_month += o_m
+        .order_by()
+    )
 
-    paid_to_owner_total = OwnerPayment.objects.filter(owner=owner).aggregate(total=Sum("amount")).get("total") or Decimal("0.00")
-    still_need_to_pay = (owner_total_all_time - paid_to_owner_total).quantize(TWO_PLACES)
+    return {
+        r["unit_id"]: {
+            "total": r["total"] if r["rents"] else None,
+            "total_this_month": r["total_this_month"] if r["rents_this_month"] else None,
+            "total_occasional": r["total_occasional"],
+            "total_occasional_this_month": r["total_occasional_this_month"],
+        }
+        for r in rows
+    }
 
-    (total_after_all_time - owner_total_all_time).quantize(TWO_PLACES)
-    (total_after_this_month - owner_total_this_month).quantize(TWO_PLACES)
 
+def _unit_figures(totals: Optional[Dict[str, Optional[Decimal]]]) -> Dict[str, Decimal]:
+    """Normalize one unit's engine row into Decimals (missing => 0.00) with net values added."""
+    totals = totals or {}
+    before_all = totals.get("total") or ZERO
+    before_m = totals.get("total_this_month") or ZERO
+    occ_all = totals.get("total_occasional") or ZERO
+    occ_m = totals.get("total_occasional_this_month") or ZERO
     return {
-        "owner_id": owner.id,
-        "owner_name": owner.full_name,
-        "total_this_month": total_before_this_month.quantize(TWO_PLACES),
-        "total": total_before_all_time.quantize(TWO_PLACES),
-        "total_occasional_this_month": total_occasional_this_month.quantize(TWO_PLACES),
-        "total_occasional": total_occasional_all_time.quantize(TWO_PLACES),
-        "total_after_occasional_this_month": total_after_this_month.quantize(TWO_PLACES),
-        "total_after_occasional": total_after_all_time.quantize(TWO_PLACES),
-        "owner_total_this_month": owner_total_this_month.quantize(TWO_PLACES),
-        "owner_total": owner_total_all_time.quantize(TWO_PLACES),
-        "paid_to_owner_total": Decimal(paid_to_owner_total).quantize(TWO_PLACES),
-        "still_need_to_pay": still_need_to_pay,
-        "units": unit_rows,
+        "total": before_all,
+        "total_this_month": before_m,
+        "total_occasional": occ_all,
+        "total_occasional_this_month": occ_m,
+        "total_after_occasional": before_all - occ_all,
+        "total_after_occasional_this_month": before_m - occ_m,
     }
 
 
-def calculate_unit_payment_summary(unit_id: int) -> dict:
+# --- Analytics helpers ---
+
+
+def calculate_owner_payment_summary(owner_id: int) -> dict:
     """
-    Build per-unit payment summary.
+    Build per-owner payment summary.
     Payload keys (unchanged):
-      unit_id, unit_name, owner_id, owner_name, owner_percentage, total_this_month, total,
-      total_occasional_this_month, total_occasional, total_after_occasional_this_month,
-      total_after_occasional, company_total_this_month, company_total
+      owner_id, owner_name, total_this_month, total, total_occasional_this_month,
+      total_occasional, total_after_occasional_this_month, total_after_occasional,
+      owner_total_this_month, owner_total, paid_to_owner_total, still_need_to_pay, units
     """
-    unit = Unit.objects.select_related("owner").get(pk=unit_id)
-    start_dt = start_of_current_month_datetime()
-    start_d = start_of_current_month_date()
+    owner = Owner.objects.get(pk=owner_id)
+    return calculate_owners_payment_summaries([owner])[owner.id]
 
-    total_before_all_time = Rent.objects.filter(unit=unit).aggregate(total=Sum("total_amount")).get("total") or Decimal("0.00")
-    total_before_this_month = Rent.objects.filter(unit=unit, payment_date__gte=start_dt).aggregate(total=Sum("total_amount")).get("total") or Decimal("0.00")
 
-    total_occasional_all_time = OccasionalPayments.objects.filter(unit=unit).aggregate(total=Sum("amount")).get("total") or Decimal("0.00")
-    total_occasional_this_month = OccasionalPayments.objects.filter(unit=unit, payment_date__gte=start_d).aggregate(total=Sum("amount")).get("total") or Decimal("0.00")
+def calculate_owners_payment_summaries(owners) -> Dict[int, dict]:
+    """
+    Build calculate_owner_payment_summary payloads for many owners at once.
+    Uses a fixed number of queries (units, grouped ledger totals, grouped payouts)
+    however many owners are passed. Returns {owner_id: payload} in the input order.
+    """
+    owners = list(owners)
+    owner_ids = [o.id for o in owners]
 
-    total_after_all_time = total_before_all_time - total_occasional_all_time
-    total_after_this_month = total_before_this_month - total_occasional_this_month
+    units_qs = Unit.objects.filter(owner_id__in=owner_ids).only("id", "name", "owner_id", "owner_percentage").order_by("owner_id", "id")
+    units_by_owner: Dict[int, list] = {}
+    for u in units_qs:
+        units_by_owner.setdefault(u.owner_id, []).append(u)
+    totals_by_unit = aggregate_unit_totals(units_qs)
+
+    paid_by_owner = dict(OwnerPayment.objects.filter(owner_id__in=owner_ids).values("owner_id").annotate(total=Sum("amount")).order_by().values_list("owner_id", "total"))
+
+    summaries: Dict[int, dict] = {}
+    for owner in owners:
+        unit_rows = []
+        grand = dict.fromkeys(("total", "total_this_month", "total_occasional", "total_occasional_this_month"), ZERO)
+        owner_total_all_time = ZERO
+        owner_total_this_month = ZERO
+
+        for u in units_by_owner.get(owner.id, []):
+            fig = _unit_figures(totals_by_unit.get(u.id))
+            for key in grand:
+                grand[key] += fig[key]
+            frac = (u.owner_percentage or Decimal("0")) / Decimal("100")
+            o_all = (fig["total_after_occasional"] * frac).quantize(TWO_PLACES)
+            o_m = (fig["total_after_occasional_this_month"] * frac).quantize(TWO_PLACES)
+
+            unit_rows.append(
+                {
+                    "unit_id": u.id,
+                    "unit_name": u.name,
+                    "owner_percentage": frac.quantize(FOUR_PLACES),
+                    "total": fig["total"].quantize(TWO_PLACES),
+                    "total_this_month": fig["total_this_month"].quantize(TWO_PLACES),
+                    "total_occasional": fig["total_occasional"].quantize(TWO_PLACES),
+                    "total_occasional_this_month": fig["total_occasional_this_month"].quantize(TWO_PLACES),
+                    "total_after_occasional": fig["total_after_occasional"].quantize(TWO_PLACES),
+                    "total_after_occasional_this_month": fig["total_after_occasional_this_month"].quantize(TWO_PLACES),
+                    "owner_total": o_all,
+                    "owner_total_this_month": o_m,
+                }
+            )
+            owner_total_all_time += o_all
+            owner_total_this_month += o_m
+
+        total_after_all_time = grand["total"] - grand["total_occasional"]
+        total_after_this_month = grand["total_this_month"] - grand["total_occasional_this_month"]
+
+        paid_to_owner_total = paid_by_owner.get(owner.id) or ZERO
+        still_need_to_pay = (owner_total_all_time - paid_to_owner_total).quantize(TWO_PLACES)
+
+        summaries[owner.id] = {
+            "owner_id": owner.id,
+            "owner_name": owner.full_name,
+            "total_this_month": grand["total_this_month"].quantize(TWO_PLACES),
+            "total": grand["total"].quantize(TWO_PLACES),
+            "total_occasional_this_month": grand["total_occasional_this_month"].quantize(TWO_PLACES),
+            "total_occasional": grand["total_occasional"].quantize(TWO_PLACES),
+            "total_after_occasional_this_month": total_after_this_month.quantize(TWO_PLACES),
+            "total_after_occasional": total_after_all_time.quantize(TWO_PLACES),
+            "owner_total_this_month": owner_total_this_month.quantize(TWO_PLACES),
+            "owner_total": owner_total_all_time.quantize(TWO_PLACES),
+            "paid_to_owner_total": Decimal(paid_to_owner_total).quantize(TWO_PLACES),
+            "still_need_to_pay": still_need_to_pay,
+            "units": unit_rows,
+        }
+
+    return summaries
+
+
+def _unit_payment_summary(unit: Unit, totals: Optional[Dict[str, Optional[Decimal]]]) -> dict:
+    fig = _unit_figures(totals)
+
+    total_after_all_time = fig["total_after_occasional"]
+    total_after_this_month = fig["total_after_occasional_this_month"]
 
     frac = (unit.owner_percentage or Decimal("0")) / Decimal("100")
     owner_total_all_time = (total_after_all_time * frac).quantize(TWO_PLACES)
@@ -191,10 +257,10 @@ def calculate_unit_payment_summary(unit_id: int) -> dict:
         "owner_id": unit.owner_id,
         "owner_name": unit.owner.full_name,
         "owner_percentage": frac.quantize(FOUR_PLACES),
-        "total_this_month": total_before_this_month.quantize(TWO_PLACES),
-        "total": total_before_all_time.quantize(TWO_PLACES),
-        "total_occasional_this_month": total_occasional_this_month.quantize(TWO_PLACES),
-        "total_occasional": total_occasional_all_time.quantize(TWO_PLACES),
+        "total_this_month": fig["total_this_month"].quantize(TWO_PLACES),
+        "total": fig["total"].quantize(TWO_PLACES),
+        "total_occasional_this_month": fig["total_occasional_this_month"].quantize(TWO_PLACES),
+        "total_occasional": fig["total_occasional"].quantize(TWO_PLACES),
         "total_after_occasional_this_month": total_after_this_month.quantize(TWO_PLACES),
         "total_after_occasional": total_after_all_time.quantize(TWO_PLACES),
         "company_total_this_month": company_total_this_month,
@@ -202,6 +268,33 @@ def calculate_unit_payment_summary(unit_id: int) -> dict:
     }
 
 
+def calculate_unit_payment_summary(unit_id: int) -> dict:
+    """
+    Build per-unit payment summary.
+    Payload keys (unchanged):
+      unit_id, unit_name, owner_id, owner_name, owner_percentage, total_this_month, total,
+      total_occasional_this_month, total_occasional, total_after_occasional_this_month,
+      total_after_occasional, company_total_this_month, company_total
+    """
+    unit = Unit.objects.select_related("owner").get(pk=unit_id)
+    return calculate_unit_payment_summaries([unit])[unit.id]
+
+
+def calculate_unit_payment_summaries(units) -> Dict[int, dict]:
+    """
+    calculate_unit_payment_summary for many Unit instances (owner should be select_related)
+    with one ledger aggregate for all of them. Returns {unit_id: summary}.
+    """
+    units = list(units)
+    totals_by_unit = aggregate_unit_totals(Unit.objects.filter(pk__in=[u.pk for u in units])) if units else {}
+    return {u.pk: _unit_payment_summary(u, totals_by_unit.get(u.pk)) for u in units}
+
+
+def cached_unit_payment_summary(unit_id: int) -> dict:
+    """calculate_unit_payment_summary served from the versioned summary cache."""
+    return cached_summary("unit", [unit_scope(unit_id)], lambda: calculate_unit_payment_summary(unit_id))
+
+
 def calculate_company_payment_summary(unit_id: int | None = None) -> dict:
     """
     Build company-wide payment summary, optionally scoped to a unit.
@@ -211,52 +304,29 @@ def calculate_company_payment_summary(unit_id: int | None = None) -> dict:
       owner_total_this_month, owner_total, company_total_this_month, company_total,
       [unit_id if provided]
     """
-    start_dt = start_of_current_month_datetime()
-    start_d = start_of_current_month_date()
-
     units_qs = Unit.objects.all().only("id", "owner_percentage")
     if unit_id is not None:
         units_qs = units_qs.filter(pk=unit_id)
-    unit_ids = list(units_qs.values_list("id", flat=True))
-
-    total_before_all_time = Rent.objects.filter(unit_id__in=unit_ids).aggregate(total=Sum("total_amount")).get("total") or Decimal("0.00")
-    total_before_this_month = Rent.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_dt).aggregate(total=Sum("total_amount")).get("total") or Decimal("0.00")
-
-    total_occasional_all_time = OccasionalPayments.objects.filter(unit_id__in=unit_ids).aggregate(total=Sum("amount")).get("total") or Decimal("0.00")
-    total_occasional_this_month = OccasionalPayments.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_d).aggregate(total=Sum("amount")).get("total") or Decimal("0.00")
-
-    total_after_all_time = total_before_all_time - total_occasional_all_time
-    total_after_this_month = total_before_this_month - total_occasional_this_month
-
-    # Compute owner totals by unit, then company = total_after - owner_total
     perc_map = {u.id: (u.owner_percentage or Decimal("0")) for u in units_qs}
-    rents_by_unit_all = {uid: amt or Decimal("0.00") for uid, amt in (Rent.objects.filter(unit_id__in=unit_ids).values_list("unit_id").annotate(s=Sum("total_amount")).values_list("unit_id", "s"))}
-    occ_by_unit_all = {
-        uid: amt or Decimal("0.00") for uid, amt in (OccasionalPayments.objects.filter(unit_id__in=unit_ids).values_list("unit_id").annotate(s=Sum("amount")).values_list("unit_id", "s"))
-    }
-    rents_by_unit_month = {
-        uid: amt or Decimal("0.00")
-        for uid, amt in (Rent.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_dt).values_list("unit_id").annotate(s=Sum("total_amount")).values_list("unit_id", "s"))
-    }
-    occ_by_unit_month = {
-        uid: amt or Decimal("0.00")
-        for uid, amt in (OccasionalPayments.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_d).values_list("unit_id").annotate(s=Sum("amount")).values_list("unit_id", "s"))
-    }
+    totals_by_unit = aggregate_unit_totals(units_qs)
 
-    owner_total_all_time = Decimal("0.00")
-    owner_total_this_month = Decimal("0.00")
+    grand = dict.fromkeys(("total", "total_this_month", "total_occasional", "total_occasional_this_month"), ZERO)
+    owner_total_all_time = ZERO
+    owner_total_this_month = ZERO
 
-    for uid, before_all in rents_by_unit_all.items():
-        occ_all = occ_by_unit_all.get(uid, Decimal("0.00"))
-        after_all = before_all - occ_all
+    # Owner share is only taken from units that have rent in the window, then company = total_after - owner_total
+    for uid, row in totals_by_unit.items():
+        fig = _unit_figures(row)
+        for key in grand:
+            grand[key] += fig[key]
         frac = Decimal(perc_map.get(uid, Decimal("0"))) / Decimal("100")
-        owner_total_all_time += after_all * frac
+        if row["total"] is not None:
+            owner_total_all_time += fig["total_after_occasional"] * frac
+        if row["total_this_month"] is not None:
+            owner_total_this_month += fig["total_after_occasional_this_month"] * frac
 
-    for uid, before_m in rents_by_unit_month.items():
-        occ_m = occ_by_unit_month.get(uid, Decimal("0.00"))
-        after_m = before_m - occ_m
-        frac = Decimal(perc_map.get(uid, Decimal("0"))) / Decimal("100")
-        owner_total_this_month += after_m * frac
+    total_after_all_time = grand["total"] - grand["total_occasional"]
+    total_after_this_month = grand["total_this_month"] - grand["total_occasional_this_month"]
 
     owner_total_all_time = owner_total_all_time.quantize(TWO_PLACES)
     owner_total_this_month = owner_total_this_month.quantize(TWO_PLACES)
@@ -265,10 +335,10 @@ def calculate_company_payment_summary(unit_id: int | None = None) -> dict:
     company_total_this_month = (total_after_this_month - owner_total_this_month).quantize(TWO_PLACES)
 
     payload: Dict[str, Any] = {
-        "total_this_month": total_before_this_month.quantize(TWO_PLACES),
-        "total": total_before_all_time.quantize(TWO_PLACES),
-        "total_occasional_this_month": total_occasional_this_month.quantize(TWO_PLACES),
-        "total_occasional": total_occasional_all_time.quantize(TWO_PLACES),
+        "total_this_month": grand["total_this_month"].quantize(TWO_PLACES),
+        "total": grand["total"].quantize(TWO_PLACES),
+        "total_occasional_this_month": grand["total_occasional_this_month"].quantize(TWO_PLACES),
+        "total_occasional": grand["total_occasional"].quantize(TWO_PLACES),
         "total_after_occasional_this_month": total_after_this_month.quantize(TWO_PLACES),
         "total_after_occasional": total_after_all_time.quantize(TWO_PLACES),
         "owner_total_this_month": owner_total_this_month,
@@ -281,3 +351,159 @@ def calculate_company_payment_summary(unit_id: int | None = None) -> dict:
         payload["unit_id"] = unit_id
 
     return payload
+
+
+# --- Arbitrary period / time-series helpers ---
+
+
+def period_start(value: date, bucket: str) -> date:
+    """Truncate a date to the start of its bucket (weeks start on Monday, like TruncWeek)."""
+    if bucket == "day":
+        return value
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    if bucket == "quarter":
+        return value.replace(month=(value.month - 1) // 3 * 3 + 1, day=1)
+    return value.replace(month=1, day=1)
+
+
+def next_period_start(value: date, bucket: str) -> date:
+    """Start of the bucket after the one starting at `value`; OverflowError / ValueError past date.max."""
+    if bucket == "day":
+        return value + timedelta(days=1)
+    if bucket == "week":
+        return value + timedelta(days=7)
+    if bucket == "year":
+        return value.replace(year=value.year + 1)
+    months = 3 if bucket == "quarter" else 1
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def count_periods(date_from: date, date_to: date, bucket: str) -> int:
+    """Number of buckets iter_periods() yields for [date_from, date_to], computed from the dates."""
+    first, last = period_start(date_from, bucket), period_start(date_to, bucket)
+    if bucket == "day":
+        return (last - first).days + 1
+    if bucket == "week":
+        return (last - first).days // 7 + 1
+    if bucket == "year":
+        return last.year - first.year + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return months // (3 if bucket == "quarter" else 1) + 1
+
+
+def iter_periods(date_from: date, date_to: date, bucket: str) -> Iterator[date]:
+    """Yield every bucket start that overlaps [date_from, date_to] (the bucket after date_to must not pass date.max)."""
+    current = period_start(date_from, bucket)
+    while current <= date_to:
+        yield current
+        current = next_period_start(current, bucket)
+
+
+def aggregate_unit_series(units: QuerySet[Unit], date_from: date, date_to: date, bucket: str) -> Dict[Tuple[int, date], Dict[str, Optional[Decimal]]]:
+    """
+    Rent and occasional totals per (unit, bucket) for an inclusive date range.
+    One grouped Trunc* query per transaction table, whatever the range or bucket size.
+    Rents are dated by payment_date (in the current timezone); rows without a date are left out.
+    """
+    trunc = SERIES_BUCKETS[bucket]
+    unit_ids = units.values("pk")
+    start_dt = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
+    end_dt = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+
+    rows: Dict[Tuple[int, date], Dict[str, Optional[Decimal]]] = {}
+
+    rent_rows = (
+        Rent.objects.filter(unit_id__in=unit_ids, payment_date__gte=start_dt, payment_date__lt=end_dt)
+        .annotate(period=trunc("payment_date", output_field=DateField()))
+        .values("unit_id", "period")
+        .annotate(total=Sum("total_amount"))
+        .order_by()
+    )
+    for r in rent_rows:
+        rows.setdefault((r["unit_id"], r["period"]), {"total": None, "total_occasional": None})["total"] = r["total"]
+
+    occ_rows = (
+        OccasionalPayments.objects.filter(unit_id__in=unit_ids, payment_date__gte=date_from, payment_date__lte=date_to)
+        .annotate(period=trunc("payment_date"))
+        .values("unit_id", "period")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for r in occ_rows:
+        rows.setdefault((r["unit_id"], r["period"]), {"total": None, "total_occasional": None})["total_occasional"] = r["total"]
+
+    return rows
+
+
+def _build_series(units_qs: QuerySet[Unit], date_from: date, date_to: date, bucket: str, company: bool = False) -> Dict[str, Any]:
+    """
+    Fold per-(unit, bucket) totals into range totals plus a gap-free series.
+    Owner share follows the matching summary helper: rounded per unit for unit/owner scopes;
+    for the company scope it is taken only from units with rent in the bucket and rounded once.
+    """
+    fracs = {u.id: (u.owner_percentage or Decimal("0")) / Decimal("100") for u in units_qs.only("id", "owner_percentage")}
+    rows = aggregate_unit_series(units_qs, date_from, date_to, bucket)
+
+    by_period: Dict[date, Dict[str, Decimal]] = {p: {"total": ZERO, "total_occasional": ZERO, "owner_total": ZERO} for p in iter_periods(date_from, date_to, bucket)}
+    for (unit_id, period), row in rows.items():
+        bucket_totals = by_period.setdefault(period, {"total": ZERO, "total_occasional": ZERO, "owner_total": ZERO})
+        before = row["total"] or ZERO
+        occ = row["total_occasional"] or ZERO
+        bucket_totals["total"] += before
+        bucket_totals["total_occasional"] += occ
+        share = (before - occ) * fracs.get(unit_id, Decimal("0"))
+        if not company:
+            bucket_totals["owner_total"] += share.quantize(TWO_PLACES)
+        elif row["total"] is not None:
+            bucket_totals["owner_total"] += share
+
+    series = []
+    grand = dict.fromkeys(("total", "total_occasional", "total_after_occasional", "owner_total", "company_total"), ZERO)
+    for period in sorted(by_period):
+        values = by_period[period]
+        after = values["total"] - values["total_occasional"]
+        owner_total = values["owner_total"].quantize(TWO_PLACES)
+        item = {
+            "period": period,
+            "total": values["total"].quantize(TWO_PLACES),
+            "total_occasional": values["total_occasional"].quantize(TWO_PLACES),
+            "total_after_occasional": after.quantize(TWO_PLACES),
+            "owner_total": owner_total,
+            "company_total": (after - owner_total).quantize(TWO_PLACES),
+        }
+        for key in grand:
+            grand[key] += item[key]
+        series.append(item)
+
+    return {"date_from": date_from, "date_to": date_to, "bucket": bucket, **grand, "series": series}
+
+
+def calculate_unit_payment_series(unit_id: int, date_from: date, date_to: date, bucket: str) -> dict:
+    """Unit summary for an arbitrary inclusive date range, split into `bucket`-sized periods."""
+    unit = Unit.objects.select_related("owner").get(pk=unit_id)
+    payload = _build_series(Unit.objects.filter(pk=unit.pk), date_from, date_to, bucket)
+    frac = (unit.owner_percentage or Decimal("0")) / Decimal("100")
+    return {
+        "unit_id": unit.id,
+        "unit_name": unit.name,
+        "owner_id": unit.owner_id,
+        "owner_name": unit.owner.full_name,
+        "owner_percentage": frac.quantize(FOUR_PLACES),
+        **payload,
+    }
+
+
+def calculate_owner_payment_series(owner_id: int, date_from: date, date_to: date, bucket: str) -> dict:
+    """Owner summary (all of the owner's units) for an arbitrary range, split into periods."""
+    owner = Owner.objects.get(pk=owner_id)
+    payload = _build_series(Unit.objects.filter(owner=owner), date_from, date_to, bucket)
+    return {"owner_id": owner.id, "owner_name": owner.full_name, **payload}
+
+
+def calculate_company_payment_series(date_from: date, date_to: date, bucket: str) -> dict:
+    """Company-wide summary for an arbitrary range, split into periods."""
+    return _build_series(Unit.objects.all(), date_from, date_to, bucket, company=True)
@@ -1,23 +1,40 @@
+from decimal import Decimal
+
 from django.shortcuts import get_object_or_404
-from rest_framework import generics, views
+from rest_framework import generics, status, views
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.exports import StreamingExportView
+from apps.core.pagination import HybridPagination
 from apps.owners.models import Owner
 from apps.payments import utils as pay_utils
+from apps.payments.cache import GLOBAL_SCOPE, cached_summary, owner_scope, summary_version_token, unit_scope
 from apps.payments.models import OccasionalPayments, OwnerPayment
 from apps.payments.serializers import (
     OccasionalPaymentSerializer,
     OccasionalPaymentWithSummarySerializer,
+    OwnerBulkPayoutSerializer,
     OwnerPaymentCreateSerializer,
+    OwnerPaymentReadSerializer,
     OwnerPaymentSummarySerializer,
+    OwnerPayoutSummarySerializer,
+    PaymentPeriodQuerySerializer,
+    PaymentSeriesSerializer,
     UnitPaymentSummarySerializer,
 )
 from apps.units.models import Unit
 
 
+class OccasionalPaymentPagination(HybridPagination):
+    ordering = ("id",)
+
+
 class UnitPaymentListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAdminUser]
+    pagination_class = OccasionalPaymentPagination
 
     def get_serializer_class(self):
         if self.request.method == "GET":
@@ -50,21 +67,74 @@ class UnitPaymentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # --- Analytics Endpoints ---
-class OwnerPaymentSummaryView(views.APIView):
+class SummaryConditionalGetMixin(ConditionalGetMixin):
+    """ETag from the summary cache versions of `summary_scopes`; unchanged summaries answer 304."""
+
+    summary_scopes = [GLOBAL_SCOPE]
+
+    def get_summary_scopes(self):
+        return self.summary_scopes
+
+    def get_conditional_parts(self):
+        return [summary_version_token(self.get_summary_scopes())]
+
+
+class OwnerPaymentSummaryView(SummaryConditionalGetMixin, views.APIView):
     permission_classes = [IsAdminUser]
 
+    def get_summary_scopes(self):
+        return [owner_scope(self.kwargs["owner_id"])]
+
     def get(self, request, owner_id: int):
         # Ensure owner exists
         owner = get_object_or_404(Owner, pk=owner_id)
-        # Calculate via utils for clarity and reuse
-        summary = pay_utils.calculate_owner_payment_summary(owner_id)
 
-        # Attach payouts history as model instances for nested serializer
-        history_qs = OwnerPayment.objects.filter(owner=owner).order_by("-date", "-id")
-        summary["payments_history"] = list(history_qs)
+        def build():
+            # Calculate via utils for clarity and reuse
+            summary = pay_utils.calculate_owner_payment_summary(owner_id)
 
-        serializer = OwnerPaymentSummarySerializer(summary)
-        return Response(serializer.data)
+            # Attach payouts history as model instances for nested serializer
+            history_qs = OwnerPayment.objects.filter(owner=owner).order_by("-date", "-id")
+            summary["payments_history"] = list(history_qs)
+            return OwnerPaymentSummarySerializer(summary).data
+
+        return Response(cached_summary("owner", [owner_scope(owner.id)], build))
+
+
+class OwnerPayoutSheetPagination(PageNumberPagination):
+    # Payout runs cover hundreds of owners; let the client fetch them in large pages
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class AllOwnersPaymentSummaryView(SummaryConditionalGetMixin, generics.ListAPIView):
+    """
+    Paginated payout sheet: every owner's totals, owner share, paid amount and still_need_to_pay.
+    Summaries for a page are computed together with grouped queries (see utils.calculate_owners_payment_summaries).
+    Equivalent to /api/all/payments/owners/
+    """
+
+    permission_classes = [IsAdminUser]
+    serializer_class = OwnerPayoutSummarySerializer
+    pagination_class = OwnerPayoutSheetPagination
+    queryset = Owner.objects.all().only("id", "full_name")
+    search_fields = ["full_name", "phone", "email"]
+    ordering_fields = ["id", "full_name", "date_joined"]
+    ordering = ["full_name", "id"]
+
+    def list(self, request, *args, **kwargs):
+        def build():
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            owners = page if page is not None else list(queryset)
+
+            summaries = pay_utils.calculate_owners_payment_summaries(owners)
+            serializer = self.get_serializer([summaries[o.id] for o in owners], many=True)
+            if page is not None:
+                return self.get_paginated_response(serializer.data).data
+            return serializer.data
+
+        return Response(cached_summary("owners", [GLOBAL_SCOPE], build, request.get_full_path()))
 
 
 class OwnerPaymentCreateView(generics.CreateAPIView):
@@ -78,17 +148,46 @@ class OwnerPaymentCreateView(generics.CreateAPIView):
         return ctx
 
 
-class UnitPaymentSummaryView(views.APIView):
+class OwnerBulkPayoutView(views.APIView):
+    """
+    Record many owner payouts at once and return the owners' updated balances.
+    Body: {"payouts": [{"owner", "amount_paid", "notes"}, ...]} or {"pay_outstanding": true, "owners": [...], "notes": "..."}
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = OwnerBulkPayoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payments = serializer.save()
+
+        owners = Owner.objects.filter(pk__in={p.owner_id for p in payments}).order_by("full_name", "id")
+        balances = pay_utils.calculate_owners_payment_summaries(owners)
+        return Response(
+            {
+                "count": len(payments),
+                "total_paid": f"{sum((p.amount for p in payments), Decimal('0.00')):.2f}",
+                "payments": OwnerPaymentReadSerializer(payments, many=True).data,
+                "balances": OwnerPayoutSummarySerializer(balances.values(), many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class UnitPaymentSummaryView(SummaryConditionalGetMixin, views.APIView):
     permission_classes = [IsAdminUser]
 
+    def get_summary_scopes(self):
+        return [unit_scope(self.kwargs["unit_id"])]
+
     def get(self, request, unit_id: int):
         # Calculate via utils for clarity and reuse
-        summary = pay_utils.calculate_unit_payment_summary(unit_id)
+        summary = pay_utils.cached_unit_payment_summary(unit_id)
         serializer = UnitPaymentSummarySerializer(summary)
         return Response(serializer.data)
 
 
-class CompanyPaymentSummaryView(views.APIView):
+class CompanyPaymentSummaryView(SummaryConditionalGetMixin, views.APIView):
     """
     Company-side summary: what remains for the company after paying owners and occasional deductions.
     Equivalent to /api/payments/all/payments/me
@@ -97,5 +196,99 @@ class CompanyPaymentSummaryView(views.APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        summary = pay_utils.calculate_company_payment_summary(unit_id=None)
+        summary = cached_summary("company", [GLOBAL_SCOPE], lambda: pay_utils.calculate_company_payment_summary(unit_id=None))
         return Response(summary)
+
+
+# --- Arbitrary period / time-series endpoints ---
+class PaymentSeriesView(SummaryConditionalGetMixin, views.APIView):
+    """
+    Base for ?from=&to=&bucket= series endpoints (not routed itself). Subclasses set:
+      - series_function: pay_utils series function, called with the URL id (if any), from, to and bucket
+      - lookup_model: model of the URL id, 404 when it doesn't exist (None for company-wide series)
+    """
+
+    permission_classes = [IsAdminUser]
+    series_function = None
+    lookup_model = None
+
+    def get_cache_scopes(self, **kwargs):
+        return [GLOBAL_SCOPE]
+
+    def get_summary_scopes(self):
+        return self.get_cache_scopes(**self.kwargs)
+
+    def get(self, request, **kwargs):
+        params = PaymentPeriodQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        period = params.validated_data
+
+        def build():
+            if self.lookup_model is not None:
+                get_object_or_404(self.lookup_model, pk=next(iter(kwargs.values())))
+            summary = self.series_function(*kwargs.values(), period["from"], period["to"], period["bucket"])
+            return PaymentSeriesSerializer(summary).data
+
+        data = cached_summary(f"series:{type(self).__name__}", self.get_cache_scopes(**kwargs), build, period["from"], period["to"], period["bucket"])
+        return Response(data)
+
+
+class UnitPaymentSeriesView(PaymentSeriesView):
+    series_function = staticmethod(pay_utils.calculate_unit_payment_series)
+    lookup_model = Unit
+
+    def get_cache_scopes(self, unit_id: int):
+        return [unit_scope(unit_id)]
+
+
+class OwnerPaymentSeriesView(PaymentSeriesView):
+    series_function = staticmethod(pay_utils.calculate_owner_payment_series)
+    lookup_model = Owner
+
+    def get_cache_scopes(self, owner_id: int):
+        return [owner_scope(owner_id)]
+
+
+class CompanyPaymentSeriesView(PaymentSeriesView):
+    series_function = staticmethod(pay_utils.calculate_company_payment_series)
+
+
+# --- Streaming exports ---
+class OccasionalPaymentExportView(StreamingExportView):
+    """Stream occasional payments as CSV/NDJSON, filterable by payment date range, owner and unit."""
+
+    queryset = OccasionalPayments.objects.all()
+    filename = "occasional-payments"
+    date_field = "payment_date"
+    owner_field = "unit__owner_id"
+    unit_field = "unit_id"
+    columns = [
+        ("id", "id"),
+        ("unit_id", "unit_id"),
+        ("unit_name", "unit__name"),
+        ("owner_id", "unit__owner_id"),
+        ("category", "category"),
+        ("amount", "amount"),
+        ("payment_method", "payment_method"),
+        ("payment_date", "payment_date"),
+        ("notes", "notes"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    ]
+
+
+class OwnerPaymentExportView(StreamingExportView):
+    """Stream owner payouts as CSV/NDJSON, filterable by payout date range and owner."""
+
+    queryset = OwnerPayment.objects.all()
+    filename = "owner-payouts"
+    date_field = "date"
+    owner_field = "owner_id"
+    columns = [
+        ("id", "id"),
+        ("owner_id", "owner_id"),
+        ("owner_name", "owner__full_name"),
+        ("amount", "amount"),
+        ("date", "date"),
+        ("notes", "notes"),
+    ]
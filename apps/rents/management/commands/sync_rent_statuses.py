@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.rents.models import Rent
+from apps.rents.utils import sync_rent_statuses
+
+
+class Command(BaseCommand):
+    help = "Recompute rent lifecycle statuses (active/expired/pending) in one set-based update. Run daily from a scheduler."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--unit", type=int, action="append", dest="unit_ids", help="Only sync rents of this unit (repeatable).")
+
+    def handle(self, *args, **options):
+        queryset = Rent.objects.all()
+        if options["unit_ids"]:
+            queryset = queryset.filter(unit_id__in=options["unit_ids"])
+        updated = sync_rent_statuses(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Synced rent statuses: {updated} rows updated."))
@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils import timezone
 
+from apps.core.side_effects import defer_side_effects
 from config.choices import PaymentMethod, PaymentStatus, RentStatus
 
 
@@ -22,6 +23,16 @@ class Rent(models.Model):
     notes = models.TextField(blank=True, null=True)
     attachment = models.FileField(upload_to="rents/attachments/", blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Change marker for conditional GETs; set-based updates must set it explicitly
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # "Which rent covers day X for this unit" lookups (unit status, current tenant, availability)
+            models.Index(fields=["unit", "rent_start", "rent_end"], name="rent_unit_period_idx"),
+            # Per-tenant current / past / upcoming / overdue checks (tenant status filter)
+            models.Index(fields=["tenant", "rent_end", "rent_start"], name="rent_tenant_period_idx"),
+        ]
 
     def __str__(self):
         return f"Rent #{self.id} - {self.unit.name} ({self.tenant.full_name})"
@@ -61,41 +72,23 @@ class Rent(models.Model):
     def save(self, *args, **kwargs):
         # Compute current lifecycle status before saving
         self._compute_status()
+        previous = None
+        if self.pk is not None:
+            previous = type(self).objects.filter(pk=self.pk).values_list("unit_id", "tenant_id", "payment_date").first()
         super().save(*args, **kwargs)
 
-        # Update unit status
-        self.unit.update_status()
-
-        # Update or create owner revenue using the unit's owner
-        from apps.owners.models import OwnerRevenue
-
-        revenue, _ = OwnerRevenue.objects.get_or_create(owner=self.unit.owner)
-        revenue.update_totals()
-
-        # Update unit financial stats
-        self.unit.update_financials()
-
-        # Update tenant lifecycle status
-        try:
-            self.tenant.update_status()
-        except Exception:
-            pass
+        # Unit/tenant status, the ledger buckets this rent left and landed in and cached summaries
+        # are recomputed once per transaction on commit
+        old_unit_id, old_tenant_id, old_payment_date = previous or (None, None, None)
+        defer_side_effects(
+            units=[self.unit_id, old_unit_id],
+            tenants=[self.tenant_id, old_tenant_id],
+            ledger_entries=[(self.unit_id, self.payment_date), previous and (old_unit_id, old_payment_date)],
+        )
 
     def delete(self, *args, **kwargs):
-        """Ensure unit availability and finances are recalculated when a rent is removed."""
-        unit = self.unit
-        owner = unit.owner
-        tenant = self.tenant
-        super().delete(*args, **kwargs)
-        # After deletion, refresh unit status and financials
-        unit.update_status()
-        unit.update_financials()
-        from apps.owners.models import OwnerRevenue
-
-        revenue, _ = OwnerRevenue.objects.get_or_create(owner=owner)
-        revenue.update_totals()
-        # Refresh tenant status after rent removal
-        try:
-            tenant.update_status()
-        except Exception:
-            pass
+        """Ensure unit availability, tenant status and the ledger are recalculated when a rent is removed."""
+        unit_id, tenant_id, payment_date = self.unit_id, self.tenant_id, self.payment_date
+        result = super().delete(*args, **kwargs)
+        defer_side_effects(units=[unit_id], tenants=[tenant_id], ledger_entries=[(unit_id, payment_date)])
+        return result
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
 from apps.rents.models import Rent
+from apps.units.pricing import quote_units
+from config.choices import PaymentMethod, PaymentStatus
 
 
 class RentSerializer(serializers.ModelSerializer):
@@ -38,6 +40,8 @@ class RentSerializer(serializers.ModelSerializer):
             "duration",
         ]
         extra_kwargs = {
+            # Priced from the unit's rate rules when omitted on create
+            "total_amount": {"required": False},
             "tenant": {"required": True, "allow_null": False},
             "unit": {"required": True, "allow_null": False},
             "payment_status": {"required": True, "allow_null": False},
@@ -99,6 +103,11 @@ class RentSerializer(serializers.ModelSerializer):
                     }
                 )
 
+        if is_create and "total_amount" not in attrs:
+            if not (unit and rent_start and rent_end and rent_end > rent_start):
+                raise serializers.ValidationError({"total_amount": "Required unless the rent spans at least one night to price from the unit's rates."})
+            attrs["total_amount"] = quote_units([unit], rent_start, rent_end)[unit.pk]["total"]
+
         return attrs
 
     # --- Computed fields ---
@@ -135,3 +144,25 @@ class RentSerializer(serializers.ModelSerializer):
             day_str = f"{rem} day" + ("s" if rem != 1 else "")
             return f"{month_str} {day_str}"
         return month_str
+
+
+class RentImportRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk rent import. Unit/tenant are plain ids and overlaps are not checked here:
+    apps.rents.utils.import_rents resolves ids and checks overlaps for the whole batch at once.
+    """
+
+    unit = serializers.IntegerField(min_value=1)
+    tenant = serializers.IntegerField(min_value=1)
+    rent_start = serializers.DateField()
+    rent_end = serializers.DateField()
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    payment_status = serializers.ChoiceField(choices=PaymentStatus.choices)
+    payment_method = serializers.ChoiceField(choices=PaymentMethod.choices)
+    payment_date = serializers.DateTimeField()
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs["rent_end"] < attrs["rent_start"]:
+            raise serializers.ValidationError({"rent_end": "Rent end date cannot be earlier than rent start date."})
+        return attrs
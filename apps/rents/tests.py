@@ -1 +1,122 @@
-# Create your tests here.
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.core.models import City, District
+from apps.owners.models import Owner
+from apps.rents.models import Rent
+from apps.rents.utils import find_overlaps, import_rents
+from apps.tenants.models import Tenant
+from apps.units.models import Unit
+
+
+class FindOverlapsTests(SimpleTestCase):
+    def test_touching_ranges_do_not_overlap(self):
+        intervals = [("u1", date(2025, 1, 1), date(2025, 1, 10), "a"), ("u1", date(2025, 1, 11), date(2025, 1, 20), "b")]
+        self.assertEqual(find_overlaps(intervals), {})
+
+    def test_shared_day_overlaps_both_ways(self):
+        intervals = [("u1", date(2025, 1, 1), date(2025, 1, 10), "a"), ("u1", date(2025, 1, 10), date(2025, 1, 20), "b")]
+        self.assertEqual(find_overlaps(intervals), {"a": "b", "b": "a"})
+
+    def test_only_same_key_is_compared(self):
+        intervals = [("u1", date(2025, 1, 1), date(2025, 1, 10), "a"), ("u2", date(2025, 1, 5), date(2025, 1, 15), "b")]
+        self.assertEqual(find_overlaps(intervals), {})
+
+    def test_interval_inside_a_long_earlier_one(self):
+        intervals = [
+            ("u1", date(2025, 1, 1), date(2025, 3, 1), "long"),
+            ("u1", date(2025, 1, 5), date(2025, 1, 6), "short"),
+            ("u1", date(2025, 2, 1), date(2025, 2, 2), "later"),
+            ("u1", date(2025, 3, 2), date(2025, 3, 5), "after"),
+        ]
+        conflicts = find_overlaps(intervals)
+        self.assertEqual(set(conflicts), {"long", "short", "later"})
+        self.assertEqual(conflicts["later"], "long")
+
+
+class ImportRentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name="Cairo")
+        district = District.objects.create(name="Zamalek", city=city)
+        owner = Owner.objects.create(full_name="Owner", phone="0100")
+        cls.unit = Unit.objects.create(
+            name="A-101",
+            owner=owner,
+            city=city,
+            district=district,
+            location_url="https://www.google.com/maps/@30.06,31.22,15z",
+            location_text="Zamalek",
+            type="apartment",
+            bedrooms=2,
+            bathrooms=1,
+            area=100,
+            lease_start=date(2025, 1, 1),
+            lease_end=date(2030, 1, 1),
+        )
+        cls.tenant = Tenant.objects.create(full_name="Tenant", phone="0111")
+        cls.other_tenant = Tenant.objects.create(full_name="Other", phone="0112")
+        cls.existing = Rent.objects.create(unit=cls.unit, tenant=cls.tenant, rent_start=date(2025, 3, 1), rent_end=date(2025, 3, 10), total_amount=Decimal("900.00"))
+
+    def row(self, start, end, tenant=None, **extra):
+        return {
+            "unit": self.unit.pk,
+            "tenant": (tenant or self.other_tenant).pk,
+            "rent_start": start,
+            "rent_end": end,
+            "total_amount": "500.00",
+            "payment_status": "paid",
+            "payment_method": "cash",
+            "payment_date": f"{start}T09:00:00Z",
+            **extra,
+        }
+
+    def errors_by_row(self, report):
+        return {item["row"]: item["errors"] for item in report["errors"]}
+
+    def test_overlap_with_existing_rent_is_rejected(self):
+        report = import_rents([self.row("2025-03-10", "2025-03-12"), self.row("2025-03-05", "2025-03-09", tenant=self.tenant)])
+        errors = self.errors_by_row(report)
+        self.assertEqual(set(errors), {1, 2})
+        self.assertIn(f"existing rent #{self.existing.pk}", errors[1]["unit"][0])
+        self.assertIn(f"existing rent #{self.existing.pk}", errors[2]["tenant"][0])
+        self.assertEqual(report["created"], 0)
+
+    def test_overlaps_within_the_batch_reject_both_rows(self):
+        report = import_rents([self.row("2025-04-01", "2025-04-05"), self.row("2025-04-05", "2025-04-08"), self.row("2025-05-01", "2025-05-02")])
+        errors = self.errors_by_row(report)
+        self.assertEqual(set(errors), {1, 2})
+        self.assertIn("row 2 of this import", errors[1]["unit"][0])
+        self.assertIn("row 1 of this import", errors[2]["unit"][0])
+        self.assertEqual(report["created"], 1)
+        self.assertTrue(Rent.objects.filter(pk__in=report["rent_ids"], rent_start=date(2025, 5, 1)).exists())
+
+    def test_touching_ranges_are_imported(self):
+        report = import_rents([self.row("2025-02-20", "2025-02-28"), self.row("2025-03-11", "2025-03-20"), self.row("2025-03-21", "2025-03-25")])
+        self.assertEqual(report["errors"], [])
+        self.assertEqual(report["created"], 3)
+
+    def test_field_errors_and_unknown_ids_are_reported_per_row(self):
+        report = import_rents([self.row("2025-06-01", "2025-05-01"), {**self.row("2025-06-01", "2025-06-02"), "unit": 999999}, {"unit": self.unit.pk}])
+        self.assertEqual(set(self.errors_by_row(report)), {1, 2, 3})
+        self.assertIn("unit", self.errors_by_row(report)[2])
+
+    def test_dry_run_inserts_nothing(self):
+        report = import_rents([self.row("2025-07-01", "2025-07-02")], dry_run=True)
+        self.assertEqual((report["valid"], report["created"]), (1, 0))
+        self.assertEqual(Rent.objects.count(), 1)
+
+    def test_valid_rows_are_inserted_all_or_nothing(self):
+        rows = [self.row("2025-08-01", "2025-08-02"), self.row("2025-08-10", "2025-08-12")]
+        with mock.patch("apps.rents.utils.defer_side_effects", side_effect=RuntimeError("side effects failed")):
+            with self.assertRaises(RuntimeError):
+                import_rents(rows)
+        self.assertEqual(Rent.objects.count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report = import_rents(rows)
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(sorted(Rent.objects.filter(pk__in=report["rent_ids"]).values_list("status", flat=True)), ["expired", "expired"])
@@ -1,11 +1,14 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from apps.rents.views import RentViewSet
+from apps.rents.views import RentExportView, RentImportView, RentViewSet
 
 router = DefaultRouter()
 router.register(r"rents", RentViewSet, basename="rent")
 
 urlpatterns = [
+    # Declared before the router so "export"/"import" aren't taken as rent ids
+    path("rents/export/", RentExportView.as_view(), name="rent-export"),
+    path("rents/import/", RentImportView.as_view(), name="rent-import"),
     path("", include(router.urls)),
 ]
@@ -0,0 +1,175 @@
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from apps.core.side_effects import defer_side_effects
+from apps.rents.models import Rent
+from apps.rents.serializers import RentImportRowSerializer
+from apps.tenants.models import Tenant
+from apps.units.models import Unit
+from config.choices import PaymentStatus, RentStatus
+
+IMPORT_FORMATS = ("csv", "json")
+
+
+def rent_status_expression(today=None) -> Case:
+    """
+    SQL CASE equivalent of Rent._compute_status, evaluated per row:
+    - paid => ACTIVE until rent_end, EXPIRED afterwards
+    - pending => PENDING
+    - overdue => EXPIRED once rent_end has passed, else PENDING
+    - anything else keeps its current status
+    CANCELED rows are excluded by the caller, as _compute_status never overrides them.
+    """
+    today = today or timezone.now().date()
+    return Case(
+        When(payment_status=PaymentStatus.PAID, rent_end__gte=today, then=Value(RentStatus.ACTIVE)),
+        When(payment_status=PaymentStatus.PAID, then=Value(RentStatus.EXPIRED)),
+        When(payment_status=PaymentStatus.PENDING, then=Value(RentStatus.PENDING)),
+        When(payment_status=PaymentStatus.OVERDUE, rent_end__lt=today, then=Value(RentStatus.EXPIRED)),
+        When(payment_status=PaymentStatus.OVERDUE, then=Value(RentStatus.PENDING)),
+        default=F("status"),
+    )
+
+
+def sync_rent_statuses(queryset=None, today=None) -> int:
+    """
+    Recompute the lifecycle status of every rent in `queryset` (default: all rents)
+    with a single UPDATE ... SET status = CASE ... statement.
+    Only rows whose status actually changes are written. Returns the number of rows updated.
+    """
+    queryset = Rent.objects.all() if queryset is None else queryset
+    expression = rent_status_expression(today)
+    return queryset.exclude(Q(status=RentStatus.CANCELED) | Q(status=expression)).update(status=expression, updated_at=timezone.now())
+
+
+# --- Bulk import ---
+def parse_rent_rows(content, file_format) -> list:
+    """
+    Turn an uploaded CSV (header row with RentImportRowSerializer field names) or JSON
+    (a list of objects, or {"rents": [...]}) into a list of row dicts. Empty CSV cells are dropped.
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    if file_format == "csv":
+        return [{key: value for key, value in row.items() if key and value not in ("", None)} for row in csv.DictReader(io.StringIO(content))]
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data = data.get("rents")
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON list of rents or {"rents": [...]}.')
+    return data
+
+
+def find_overlaps(intervals) -> dict:
+    """
+    Find overlapping closed [start, end] intervals per key with one sort and a linear sweep.
+    `intervals` is an iterable of (key, start, end, ref). Returns {ref: other_ref} for every
+    interval that overlaps at least one other interval with the same key.
+
+    An interval overlaps something iff an earlier-starting interval ends on/after its start
+    (tracked as the running max end), or the next interval in start order begins on/before its end.
+    """
+    by_key = {}
+    for key, start, end, ref in intervals:
+        by_key.setdefault(key, []).append((start, end, ref))
+
+    conflicts = {}
+    for items in by_key.values():
+        items.sort(key=lambda item: (item[0], item[1]))
+        furthest = None  # (end, ref) of the earlier interval reaching furthest right
+        for i, (start, end, ref) in enumerate(items):
+            if furthest is not None and furthest[0] >= start:
+                conflicts.setdefault(ref, furthest[1])
+            elif i + 1 < len(items) and items[i + 1][0] <= end:
+                conflicts.setdefault(ref, items[i + 1][2])
+            if furthest is None or end > furthest[0]:
+                furthest = (end, ref)
+    return conflicts
+
+
+def import_rents(rows, dry_run=False) -> dict:
+    """
+    Validate and insert many rents at once.
+    - Field errors, unknown units/tenants and overlaps (with existing rents and within the batch,
+      per unit and per tenant) are collected for every row; rows with errors are skipped.
+    - Existing rents of the affected units/tenants are loaded with a single query.
+    - Valid rows are written with bulk_create in one transaction; unit/tenant status, the ledger
+      and cached summaries are refreshed once on commit.
+    Rows are numbered from 1 in the returned report.
+    """
+    errors = {}
+    valid = {}
+    for number, row in enumerate(rows, start=1):
+        serializer = RentImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid[number] = serializer.validated_data
+        else:
+            errors[number] = serializer.errors
+
+    unit_ids = {data["unit"] for data in valid.values()}
+    tenant_ids = {data["tenant"] for data in valid.values()}
+    known_units = set(Unit.objects.filter(pk__in=unit_ids).values_list("pk", flat=True))
+    known_tenants = set(Tenant.objects.filter(pk__in=tenant_ids).values_list("pk", flat=True))
+    for number, data in list(valid.items()):
+        row_errors = {}
+        if data["unit"] not in known_units:
+            row_errors["unit"] = [f"Unit {data['unit']} does not exist."]
+        if data["tenant"] not in known_tenants:
+            row_errors["tenant"] = [f"Tenant {data['tenant']} does not exist."]
+        if row_errors:
+            errors[number] = row_errors
+            del valid[number]
+
+    if valid:
+        existing = Rent.objects.filter(Q(unit_id__in=unit_ids) | Q(tenant_id__in=tenant_ids)).filter(
+            rent_end__gte=min(data["rent_start"] for data in valid.values()),
+            rent_start__lte=max(data["rent_end"] for data in valid.values()),
+        )
+        existing = list(existing.values_list("pk", "unit_id", "tenant_id", "rent_start", "rent_end"))
+
+        # refs: ("row", number) for batch rows, ("rent", pk) for stored rents
+        for field, index in (("unit", 1), ("tenant", 2)):
+            intervals = [(data[field], data["rent_start"], data["rent_end"], ("row", number)) for number, data in valid.items()]
+            intervals += [(rent[index], rent[3], rent[4], ("rent", rent[0])) for rent in existing]
+            for (kind, number), (other_kind, other) in find_overlaps(intervals).items():
+                if kind != "row":
+                    continue
+                other_label = f"existing rent #{other}" if other_kind == "rent" else f"row {other} of this import"
+                errors.setdefault(number, {}).setdefault(field, []).append(f"Overlaps {other_label} for this {field}.")
+        for number in errors:
+            valid.pop(number, None)
+
+    created = []
+    if valid and not dry_run:
+        rents = []
+        for data in valid.values():
+            rent = Rent(
+                unit_id=data["unit"],
+                tenant_id=data["tenant"],
+                **{key: value for key, value in data.items() if key not in ("unit", "tenant")},
+            )
+            rent._compute_status()
+            rents.append(rent)
+        with transaction.atomic():
+            created = Rent.objects.bulk_create(rents)
+            # bulk_create skips Rent.save, so queue its side effects for the whole batch
+            defer_side_effects(
+                units=[rent.unit_id for rent in created],
+                tenants=[rent.tenant_id for rent in created],
+                ledger_entries=[(rent.unit_id, rent.payment_date) for rent in created],
+            )
+
+    return {
+        "total": len(rows),
+        "valid": len(valid),
+        "created": len(created),
+        "rejected": len(errors),
+        "dry_run": dry_run,
+        "rent_ids": [rent.pk for rent in created],
+        "errors": [{"row": number, "errors": errors[number]} for number in sorted(errors)],
+    }
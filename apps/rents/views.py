@@ -1,16 +1,30 @@
-from rest_framework import viewsets
+import os
+
+from rest_framework import serializers, status, views, viewsets
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.exports import StreamingExportView
+from apps.core.pagination import HybridPagination
 from apps.rents.models import Rent
 from apps.rents.serializers import RentSerializer
+from apps.rents.utils import IMPORT_FORMATS, import_rents, parse_rent_rows
+from apps.tenants.models import Tenant
+from apps.units.models import Unit
+
+
+class RentPagination(HybridPagination):
+    ordering = ("-created_at", "-id")
 
 
 # Admin-only CRUD for rents
-class RentViewSet(viewsets.ModelViewSet):
-    queryset = Rent.objects.select_related("unit", "tenant").all().order_by("-created_at")
+class RentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Rent.objects.select_related("unit", "tenant").all().order_by("-created_at", "-id")
     serializer_class = RentSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = RentPagination
+    conditional_models = (Rent, Unit, Tenant)
     # Enable filtering by foreign keys using default DjangoFilterBackend
     filterset_fields = ["unit", "tenant"]
 
@@ -31,31 +45,66 @@ class RentViewSet(viewsets.ModelViewSet):
 
         return qs
 
-    # --- Ensure fresh computed data on every GET ---
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+    # list/retrieve are plain reads: lifecycle statuses are kept current by Rent.save
+    # and the set-based `manage.py sync_rent_statuses` sweep, not by saving on every GET
+
+
+class RentExportView(StreamingExportView):
+    """Stream every rent as CSV/NDJSON, filterable by payment date range, owner and unit."""
+
+    queryset = Rent.objects.all()
+    filename = "rents"
+    date_field = "payment_date"
+    owner_field = "unit__owner_id"
+    unit_field = "unit_id"
+    columns = [
+        ("id", "id"),
+        ("unit_id", "unit_id"),
+        ("unit_name", "unit__name"),
+        ("owner_id", "unit__owner_id"),
+        ("tenant_id", "tenant_id"),
+        ("tenant_name", "tenant__full_name"),
+        ("rent_start", "rent_start"),
+        ("rent_end", "rent_end"),
+        ("total_amount", "total_amount"),
+        ("payment_status", "payment_status"),
+        ("payment_method", "payment_method"),
+        ("payment_date", "payment_date"),
+        ("status", "status"),
+        ("notes", "notes"),
+        ("created_at", "created_at"),
+    ]
 
-        page = self.paginate_queryset(queryset)
-        items = page if page is not None else list(queryset)
 
-        # Recompute status and cascade updates by saving each item
-        for rent in items:
+class RentImportView(views.APIView):
+    """
+    Bulk-create rents from a JSON body (a list, or {"rents": [...]}) or an uploaded `file` (.csv / .json).
+    Valid rows are inserted, every rejected row is reported. ?dry_run=true only validates.
+    """
+
+    permission_classes = [IsAdminUser]
+    MAX_ROWS = 5000
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is not None:
+            file_format = os.path.splitext(upload.name)[1].lstrip(".").lower()
+            if file_format not in IMPORT_FORMATS:
+                raise serializers.ValidationError({"file": f"Unsupported file type; use one of: {', '.join(IMPORT_FORMATS)}."})
             try:
-                rent.save()
-            except Exception:
-                # Avoid breaking the response if a single item fails to update
-                pass
-
-        serializer = self.get_serializer(items, many=True)
-        if page is not None:
-            return self.get_paginated_response(serializer.data)
-        return Response(serializer.data)
-
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        try:
-            instance.save()
-        except Exception:
-            pass
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+                rows = parse_rent_rows(upload.read(), file_format)
+            except (ValueError, UnicodeDecodeError) as exc:
+                raise serializers.ValidationError({"file": str(exc)})
+        else:
+            rows = request.data.get("rents") if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                raise serializers.ValidationError({"rents": 'Send a list of rents, {"rents": [...]} or a CSV/JSON `file`.'})
+
+        if not rows:
+            raise serializers.ValidationError({"rents": "No rows to import."})
+        if len(rows) > self.MAX_ROWS:
+            raise serializers.ValidationError({"rents": f"At most {self.MAX_ROWS} rows per request; use `manage.py import_rents` for larger files."})
+
+        dry_run = str(request.query_params.get("dry_run", "")).lower() in ("1", "true", "yes")
+        report = import_rents(rows, dry_run=dry_run)
+        return Response(report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_200_OK)
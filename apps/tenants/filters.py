@@ -1,7 +1,11 @@
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django_filters import rest_framework as filters
 
+from apps.core.search import matching_ids
+from apps.rents.models import Rent
 from apps.tenants.models import Tenant
+from apps.tenants.utils import filter_by_status
+from apps.units.models import Unit
 
 
 class TenantFilter(filters.FilterSet):
@@ -17,18 +21,13 @@ class TenantFilter(filters.FilterSet):
         fields = ["full_name", "email", "phone", "address", "search", "status"]
 
     def filter_search(self, queryset, name, value):
-        return queryset.filter(Q(full_name__icontains=value) | Q(rents__unit__name__icontains=value)).distinct()
+        # Tenant name or the name of any unit they rented. The search index narrows the candidates
+        # (its text also holds phone/email/location, hence the icontains on the names themselves);
+        # one EXISTS per tenant instead of joining every rent row and de-duplicating
+        units = Unit.objects.filter(pk__in=matching_ids("unit", value), name__icontains=value).values("pk")
+        rented_match = Rent.objects.filter(tenant=OuterRef("pk"), unit_id__in=units)
+        return queryset.filter(Q(pk__in=matching_ids("tenant", value), full_name__icontains=value) | Exists(rented_match))
 
     def filter_status(self, queryset, name, value):
-        today = timezone.now().date()
-
-        def get_status_filter(rent):
-            if rent.payment_status == Rent.PaymentStatus.PAID and rent.rent_end < today:
-                return "completed"
-            elif rent.rent_start <= today <= rent.rent_end:
-                return "active"
-            elif rent.rent_end < today and rent.payment_status != Rent.PaymentStatus.PAID:
-                return "overdue"
-            return "pending"
-
-        return queryset.filter(rents__in=[rent for rent in Rent.objects.all() if get_status_filter(rent) == value])
+        # Evaluated by the database (EXISTS per tenant on the page), not by classifying every rent in Python
+        return filter_by_status(queryset, value)
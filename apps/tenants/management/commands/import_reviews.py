@@ -0,0 +1,31 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tenants.utils import IMPORT_FORMATS, import_reviews, parse_review_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk-import tenant reviews from a CSV or JSON file. Valid rows are inserted; rejected rows are reported."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .json file.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, insert nothing.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = os.path.splitext(path)[1].lstrip(".").lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(f"Unsupported file type; use one of: {', '.join(IMPORT_FORMATS)}.")
+        try:
+            with open(path, "rb") as fh:
+                rows = parse_review_rows(fh.read(), file_format)
+        except (OSError, ValueError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc))
+
+        report = import_reviews(rows, dry_run=options["dry_run"])
+        for item in report["errors"]:
+            self.stderr.write(f"Row {item['row']}: {json.dumps(item['errors'])}")
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} reviews: {report['valid']} valid, {report['created']} created, {report['rejected']} rejected of {report['total']}."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.tenants.utils import reconcile_tenant_ratings
+
+
+class Command(BaseCommand):
+    help = "Recount tenant review aggregates (review_count, rating_sum, rate) from the reviews table and fix the ones that drifted."
+
+    def handle(self, *args, **options):
+        fixed = reconcile_tenant_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled tenant ratings: {fixed} tenants fixed."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.tenants.models import Tenant
+from apps.tenants.utils import sync_tenant_statuses
+
+
+class Command(BaseCommand):
+    help = "Set tenants to active/completed/inactive from today's rents in one query and one bulk update. Run daily after midnight."
+
+    def handle(self, *args, **options):
+        updated = sync_tenant_statuses(Tenant.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Synced tenant statuses: {updated} tenants updated."))
@@ -1,8 +1,9 @@
+from decimal import Decimal
+
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import Avg
-from django.utils import timezone
+from django.db import models, transaction
 
+from apps.core.search import index_saved, remove_objects
 from config.choices import TenantStatus
 
 
@@ -11,46 +12,61 @@ class Tenant(models.Model):
     phone = models.CharField(max_length=20)
     email = models.EmailField(blank=True, null=True)
     rate = models.DecimalField(max_digits=3, decimal_places=1, default=5.0)
+    # Review aggregates behind `rate`, adjusted with F() on every review write (see apps.tenants.utils)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=1, default=0, editable=False)
     address = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=TenantStatus.choices, default=TenantStatus.INACTIVE)
+    # Change marker for conditional GETs; set-based updates must set it explicitly
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.full_name
 
-    # Compute and persist average review rating into the tenant.rate field
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        index_saved("tenant", self, kwargs.get("update_fields"))
+
+    def delete(self, *args, **kwargs):
+        # Rents go away by cascade (Rent.delete isn't called), so queue what they fed
+        from apps.core.side_effects import defer_side_effects
+
+        tenant_id = self.pk
+        rents = list(self.rents.values_list("unit_id", "payment_date"))
+        result = super().delete(*args, **kwargs)
+        remove_objects("tenant", [tenant_id])
+        defer_side_effects(units=[unit_id for unit_id, _ in rents], ledger_entries=rents)
+        return result
+
+    # Recount reviews and persist review_count, rating_sum and the average into tenant.rate
     def recalc_rate(self, save: bool = True):
-        agg = self.reviews.aggregate(avg=Avg("rate"))
-        avg_rate = agg["avg"]
-        # If no reviews, keep default behavior as 5.0
-        new_rate = round(float(avg_rate), 1) if avg_rate is not None else 5.0
-        if float(self.rate) != new_rate:
-            self.rate = new_rate
-            if save:
-                self.save(update_fields=["rate"])
+        """Full recount from the reviews table; review writes keep the aggregates current incrementally."""
+        from apps.tenants.utils import reconcile_tenant_ratings, with_review_totals
+
+        queryset = type(self).objects.filter(pk=self.pk)
+        if save:
+            if reconcile_tenant_ratings(queryset):
+                self.refresh_from_db(fields=["review_count", "rating_sum", "rate", "updated_at"])
+        else:
+            self.review_count, self.rating_sum, rate = with_review_totals(queryset).values_list("actual_review_count", "actual_rating_sum", "actual_rate").get()
+            self.rate = Decimal(rate).quantize(Decimal("0.1"))
 
     def update_status(self, save: bool = True):
         """Compute tenant lifecycle status based on rents.
         - active: has a rent that includes today
         - completed: has past rents only (no active or upcoming)
         - inactive: no rents at all or only upcoming rents (or mix of past+upcoming but none active)
+        Many tenants at once: apps.tenants.utils.sync_tenant_statuses (same rules, set-based).
         """
-        today = timezone.now().date()
-        rents = self.rents.all()
-        if rents.filter(rent_start__lte=today, rent_end__gte=today).exists():
-            new_status = TenantStatus.ACTIVE
-        else:
-            has_past = rents.filter(rent_end__lt=today).exists()
-            has_upcoming = rents.filter(rent_start__gt=today).exists()
-            if has_past and not has_upcoming:
-                new_status = TenantStatus.COMPLETED
-            else:
-                new_status = TenantStatus.INACTIVE
+        from apps.tenants.utils import sync_tenant_statuses, with_lifecycle_status
 
-        if self.status != new_status:
-            self.status = new_status
-            if save:
-                self.save(update_fields=["status"])
+        queryset = type(self).objects.filter(pk=self.pk)
+        if save:
+            if sync_tenant_statuses(queryset):
+                self.refresh_from_db(fields=["status", "updated_at"])
+        else:
+            self.status = with_lifecycle_status(queryset).values_list("lifecycle_status", flat=True).get()
 
 
 class Review(models.Model):
@@ -71,21 +87,26 @@ class Review(models.Model):
         return f"Review({self.tenant_id}) rate={self.rate}"
 
     def save(self, *args, **kwargs):
-        is_update = self.pk is not None
-        # On update, we won't allow changing tenant via serializer; if changed manually, recalc both
-        prev_tenant_id = None
-        if is_update:
-            try:
-                prev_tenant_id = type(self).objects.only("tenant_id").get(pk=self.pk).tenant_id
-            except type(self).DoesNotExist:
-                prev_tenant_id = None
-        super().save(*args, **kwargs)
-        # Recalc for affected tenant(s)
-        if prev_tenant_id and prev_tenant_id != self.tenant_id:
-            Tenant.objects.filter(pk=prev_tenant_id).first() and Tenant.objects.get(pk=prev_tenant_id).recalc_rate()
-        self.tenant.recalc_rate()
+        from apps.tenants.utils import apply_review_deltas
+
+        # On update, we won't allow changing tenant via serializer; if changed manually, move the rating too
+        previous = None
+        if self.pk is not None:
+            previous = type(self).objects.filter(pk=self.pk).values_list("tenant_id", "rate").first()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            deltas = {}
+            if previous:
+                deltas[previous[0]] = (-1, -previous[1])
+            count, total = deltas.get(self.tenant_id, (0, 0))
+            deltas[self.tenant_id] = (count + 1, total + Decimal(str(self.rate)))
+            apply_review_deltas(deltas)
 
     def delete(self, *args, **kwargs):
-        tenant = self.tenant
-        super().delete(*args, **kwargs)
-        tenant.recalc_rate()
+        from apps.tenants.utils import apply_review_deltas
+
+        tenant_id, rate = self.tenant_id, Decimal(str(self.rate))
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            apply_review_deltas({tenant_id: (-1, -rate)})
+        return result
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.utils import timezone
 from rest_framework import serializers
 
@@ -25,6 +27,14 @@ class ReviewSerializer(serializers.ModelSerializer):
         return obj.created_at.date().isoformat()
 
 
+class ReviewImportRowSerializer(serializers.Serializer):
+    """One row of a bulk review import; apps.tenants.utils.import_reviews resolves tenant ids for the whole batch."""
+
+    tenant = serializers.IntegerField(min_value=1)
+    comment = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    rate = serializers.DecimalField(max_digits=2, decimal_places=1, min_value=Decimal("1"), max_value=Decimal("5"))
+
+
 class TenantListSerializer(serializers.ModelSerializer):
     rent_info = serializers.SerializerMethodField()
 
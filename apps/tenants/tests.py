@@ -1 +1,112 @@
-# Create your tests here.
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.core.tests import create_unit
+from apps.owners.models import Owner
+from apps.rents.models import Rent
+from apps.tenants.models import Review, Tenant
+from apps.tenants.utils import filter_by_status, reconcile_tenant_ratings
+
+
+class TenantRatingTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(full_name="Tenant", phone="0111")
+        self.other_tenant = Tenant.objects.create(full_name="Other", phone="0112")
+
+    def assertRating(self, tenant, count, total, rate):
+        tenant.refresh_from_db()
+        self.assertEqual((tenant.review_count, tenant.rating_sum, tenant.rate), (count, Decimal(total), Decimal(rate)))
+
+    def test_tenant_without_reviews_keeps_the_default_rate(self):
+        self.assertRating(self.tenant, 0, "0", "5.0")
+
+    def test_creating_reviews_updates_the_average(self):
+        Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        self.assertRating(self.tenant, 1, "4.0", "4.0")
+        Review.objects.create(tenant=self.tenant, rate=Decimal("3.0"))
+        self.assertRating(self.tenant, 2, "7.0", "3.5")
+
+    def test_average_is_rounded_half_up(self):
+        Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        Review.objects.create(tenant=self.tenant, rate=Decimal("4.5"))
+        self.assertRating(self.tenant, 2, "8.5", "4.3")
+
+    def test_changing_a_rate_replaces_the_old_one(self):
+        review = Review.objects.create(tenant=self.tenant, rate=Decimal("2.0"))
+        Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        review.rate = Decimal("5.0")
+        review.save()
+        self.assertRating(self.tenant, 2, "9.0", "4.5")
+
+    def test_moving_a_review_updates_both_tenants(self):
+        review = Review.objects.create(tenant=self.tenant, rate=Decimal("2.0"))
+        Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        review.tenant = self.other_tenant
+        review.save()
+        self.assertRating(self.tenant, 1, "4.0", "4.0")
+        self.assertRating(self.other_tenant, 1, "2.0", "2.0")
+
+    def test_deleting_reviews_updates_the_average(self):
+        review = Review.objects.create(tenant=self.tenant, rate=Decimal("2.0"))
+        last = Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        review.delete()
+        self.assertRating(self.tenant, 1, "4.0", "4.0")
+        last.delete()
+        self.assertRating(self.tenant, 0, "0", "5.0")
+
+    def test_reconcile_fixes_drift_from_queryset_updates(self):
+        Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        Review.objects.create(tenant=self.other_tenant, rate=Decimal("3.0"))
+        Review.objects.filter(tenant=self.tenant).update(rate=Decimal("2.0"))
+        self.assertRating(self.tenant, 1, "4.0", "4.0")
+
+        self.assertEqual(reconcile_tenant_ratings(), 1)
+        self.assertRating(self.tenant, 1, "2.0", "2.0")
+        self.assertRating(self.other_tenant, 1, "3.0", "3.0")
+        self.assertEqual(reconcile_tenant_ratings(), 0)
+
+    def test_reconcile_command_and_recalc_rate(self):
+        Review.objects.create(tenant=self.tenant, rate=Decimal("4.0"))
+        Tenant.objects.filter(pk=self.tenant.pk).update(review_count=0, rating_sum=0, rate=Decimal("5.0"))
+        self.tenant.recalc_rate(save=False)
+        self.assertEqual((self.tenant.review_count, self.tenant.rate), (1, Decimal("4.0")))
+
+        call_command("reconcile_tenant_ratings", stdout=StringIO())
+        self.assertRating(self.tenant, 1, "4.0", "4.0")
+
+
+class TenantStatusFilterTests(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.unit = create_unit("A-101", Owner.objects.create(full_name="Owner", phone="0100"), lease_start=today - timedelta(days=400), lease_end=today + timedelta(days=400))
+        self.days = lambda offset: today + timedelta(days=offset)
+        # paid past rent plus an upcoming one: lifecycle status inactive, but completed for the filter
+        self.paid_then_upcoming = self.tenant_with_rents("Paid then upcoming", (-40, -31, "paid"), (30, 39, "pending"))
+        self.paid_past = self.tenant_with_rents("Paid past", (-60, -51, "paid"))
+        self.unpaid_past = self.tenant_with_rents("Unpaid past", (-80, -71, "pending"))
+        self.current = self.tenant_with_rents("Current", (-5, 5, "paid"))
+        self.no_rents = Tenant.objects.create(full_name="No rents", phone="0199")
+
+    def tenant_with_rents(self, name, *rents):
+        tenant = Tenant.objects.create(full_name=name, phone="0111")
+        for start, end, payment_status in rents:
+            Rent.objects.create(unit=self.unit, tenant=tenant, rent_start=self.days(start), rent_end=self.days(end), total_amount=Decimal("900.00"), payment_status=payment_status)
+        return tenant
+
+    def matching(self, value):
+        return set(filter_by_status(Tenant.objects.all(), value))
+
+    def test_completed_means_a_paid_rent_that_ended(self):
+        self.assertEqual(self.matching("completed"), {self.paid_then_upcoming, self.paid_past})
+
+    def test_other_values(self):
+        self.assertEqual(self.matching("active"), {self.current})
+        self.assertEqual(self.matching("overdue"), {self.unpaid_past})
+        self.assertEqual(self.matching("pending"), {self.paid_then_upcoming})
+        self.assertEqual(self.matching("inactive"), {self.paid_then_upcoming, self.no_rents})
+        self.assertEqual(self.matching("unknown"), set())
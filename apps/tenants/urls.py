@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from apps.tenants.views import ReviewViewSet, TenantViewSet
+from apps.tenants.views import ReviewImportView, ReviewViewSet, TenantViewSet
 
 router = DefaultRouter()
 # Important: register 'tenants/reviews' BEFORE 'tenants' to avoid shadowing by the tenant detail route
@@ -9,5 +9,7 @@ router.register(r"tenants/reviews", ReviewViewSet, basename="tenant-review")
 router.register(r"tenants", TenantViewSet, basename="tenant")
 
 urlpatterns = [
+    # Declared before the router so "import" isn't taken as a review id
+    path("tenants/reviews/import/", ReviewImportView.as_view(), name="tenant-review-import"),
     path("", include(router.urls)),
 ]
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Exists, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from apps.rents.models import Rent
+from apps.tenants.models import Review, Tenant
+from apps.tenants.serializers import ReviewImportRowSerializer
+from config.choices import PaymentStatus, TenantStatus
+
+IMPORT_FORMATS = ("csv", "json")
+# Tenant.rate without reviews
+DEFAULT_RATE = Decimal("5.0")
+
+# ?status= values answered from the tenant's rents rather than the lifecycle status
+PENDING = "pending"  # has a rent that hasn't started yet
+OVERDUE = "overdue"  # has a rent that ended unpaid
+
+
+def rent_flags(today=None) -> dict:
+    """
+    Correlated EXISTS over the tenant's rents, each an index range scan on (tenant, rent_end, rent_start):
+    has_current_rent, has_past_rent, has_upcoming_rent, has_overdue_rent, has_completed_rent (ended and paid).
+    """
+    today = today or timezone.now().date()
+    rents = Rent.objects.filter(tenant=OuterRef("pk"))
+    return {
+        "has_current_rent": Exists(rents.filter(rent_start__lte=today, rent_end__gte=today)),
+        "has_past_rent": Exists(rents.filter(rent_end__lt=today)),
+        "has_upcoming_rent": Exists(rents.filter(rent_start__gt=today)),
+        "has_overdue_rent": Exists(rents.filter(rent_end__lt=today).exclude(payment_status=PaymentStatus.PAID)),
+        "has_completed_rent": Exists(rents.filter(rent_end__lt=today, payment_status=PaymentStatus.PAID)),
+    }
+
+
+def with_lifecycle_status(queryset, today=None):
+    """
+    Annotate tenants with lifecycle_status, the status Tenant.update_status() would store, computed
+    by the database (same rules: active > completed (past rents only) > inactive).
+    """
+    flags = rent_flags(today)
+    return queryset.annotate(
+        lifecycle_status=Case(
+            When(flags["has_current_rent"], then=Value(TenantStatus.ACTIVE)),
+            When(Q(flags["has_past_rent"]) & ~Q(flags["has_upcoming_rent"]), then=Value(TenantStatus.COMPLETED)),
+            default=Value(TenantStatus.INACTIVE),
+        )
+    )
+
+
+def sync_tenant_statuses(queryset, today=None, batch_size: int = 1000) -> int:
+    """
+    Set-based version of Tenant.update_status for every tenant in `queryset`: one annotated query
+    returns only the tenants whose stored status differs from their lifecycle status, and they are
+    written with a single bulk_update. Returns the number of tenants changed.
+    """
+    now = timezone.now()
+    changed = list(with_lifecycle_status(queryset.order_by(), today).exclude(status=F("lifecycle_status")).only("pk", "status"))
+    for tenant in changed:
+        tenant.status = tenant.lifecycle_status
+        tenant.updated_at = now
+    queryset.model.objects.bulk_update(changed, ["status", "updated_at"], batch_size=batch_size)
+    return len(changed)
+
+
+def filter_by_status(queryset, value, today=None):
+    """
+    Tenants matching a ?status= value; unknown values match nothing. `completed` keeps its filter
+    meaning (has a paid rent that ended), which differs from the stored lifecycle status of that
+    name; `active` and `inactive` follow the lifecycle status.
+    """
+    flags = rent_flags(today)
+    if value == TenantStatus.COMPLETED:
+        return queryset.filter(flags["has_completed_rent"])
+    if value in TenantStatus.values:
+        return with_lifecycle_status(queryset, today).filter(lifecycle_status=value)
+    if value == PENDING:
+        return queryset.filter(flags["has_upcoming_rent"])
+    if value == OVERDUE:
+        return queryset.filter(flags["has_overdue_rent"])
+    return queryset.none()
+
+
+# --- Review aggregates ---
+def rate_expression(count, total):
+    """
+    Average rating rounded half-up to 1 decimal (4.25 -> 4.3) from review count / rating sum
+    expressions; DEFAULT_RATE without reviews. The average is cast to numeric before rounding
+    (PostgreSQL has no ROUND(double precision, int)).
+    """
+    average = Cast(Cast(total, FloatField()) / count, DecimalField(max_digits=12, decimal_places=4))
+    return Case(
+        When(GreaterThan(count, 0), then=Round(average, 1)),
+        default=Value(DEFAULT_RATE),
+        output_field=DecimalField(max_digits=3, decimal_places=1),
+    )
+
+
+def apply_review_deltas(deltas) -> None:
+    """
+    Adjust review_count / rating_sum / rate of tenants by {tenant_id: (count_delta, sum_delta)}:
+    one UPDATE per tenant computed from the stored values with F(), so concurrent review writes
+    don't overwrite each other and no review is re-read.
+    """
+    now = timezone.now()
+    for tenant_id, (count, total) in deltas.items():
+        if not count and not total:
+            continue
+        new_count = F("review_count") + count
+        new_sum = F("rating_sum") + Decimal(total)
+        Tenant.objects.filter(pk=tenant_id).update(review_count=new_count, rating_sum=new_sum, rate=rate_expression(new_count, new_sum), updated_at=now)
+
+
+def _review_totals():
+    reviews = Review.objects.filter(tenant=OuterRef("pk")).order_by().values("tenant")
+    count = Coalesce(Subquery(reviews.annotate(total=Count("pk")).values("total")), 0)
+    total = Coalesce(Subquery(reviews.annotate(total=Sum("rate")).values("total")), Value(Decimal("0")), output_field=DecimalField(max_digits=12, decimal_places=1))
+    return count, total
+
+
+def with_review_totals(queryset):
+    """Annotate tenants with actual_review_count, actual_rating_sum and actual_rate counted from their reviews."""
+    count, total = _review_totals()
+    return queryset.annotate(actual_review_count=count, actual_rating_sum=total).annotate(actual_rate=rate_expression(F("actual_review_count"), F("actual_rating_sum")))
+
+
+def reconcile_tenant_ratings(queryset=None) -> int:
+    """
+    Recount review aggregates for tenants in `queryset` (default: all tenants) and fix the ones that
+    drifted (e.g. reviews written with raw SQL or queryset.update()): one query finds them, one UPDATE
+    rewrites them. Returns the number of tenants fixed.
+    """
+    queryset = Tenant.objects.all() if queryset is None else queryset
+    drifted = with_review_totals(queryset.order_by()).exclude(review_count=F("actual_review_count"), rating_sum=F("actual_rating_sum"), rate=F("actual_rate"))
+    drifted_ids = list(drifted.values_list("pk", flat=True))
+    if drifted_ids:
+        count, total = _review_totals()
+        Tenant.objects.filter(pk__in=drifted_ids).update(review_count=count, rating_sum=total, rate=rate_expression(count, total), updated_at=timezone.now())
+    return len(drifted_ids)
+
+
+# --- Bulk review import ---
+def parse_review_rows(content, file_format) -> list:
+    """
+    Turn a CSV (header row with ReviewImportRowSerializer field names) or JSON (a list of objects,
+    or {"reviews": [...]}) into a list of row dicts. Empty CSV cells are dropped.
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    if file_format == "csv":
+        return [{key: value for key, value in row.items() if key and value not in ("", None)} for row in csv.DictReader(io.StringIO(content))]
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data = data.get("reviews")
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON list of reviews or {"reviews": [...]}.')
+    return data
+
+
+def import_reviews(rows, dry_run=False) -> dict:
+    """
+    Validate and insert many reviews at once: valid rows are written with bulk_create and each
+    tenant's review aggregates are adjusted once for the whole batch. Rows are numbered from 1.
+    """
+    errors = {}
+    valid = {}
+    for number, row in enumerate(rows, start=1):
+        serializer = ReviewImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid[number] = serializer.validated_data
+        else:
+            errors[number] = serializer.errors
+
+    known_tenants = set(Tenant.objects.filter(pk__in={data["tenant"] for data in valid.values()}).values_list("pk", flat=True))
+    for number, data in list(valid.items()):
+        if data["tenant"] not in known_tenants:
+            errors[number] = {"tenant": [f"Tenant {data['tenant']} does not exist."]}
+            del valid[number]
+
+    created = []
+    if valid and not dry_run:
+        deltas = {}
+        for data in valid.values():
+            count, total = deltas.get(data["tenant"], (0, Decimal("0")))
+            deltas[data["tenant"]] = (count + 1, total + data["rate"])
+        with transaction.atomic():
+            # bulk_create skips Review.save, so the aggregates are adjusted here, once per tenant
+            created = Review.objects.bulk_create([Review(tenant_id=data["tenant"], comment=data.get("comment") or "", rate=data["rate"]) for data in valid.values()])
+            apply_review_deltas(deltas)
+
+    return {
+        "total": len(rows),
+        "valid": len(valid),
+        "created": len(created),
+        "rejected": len(errors),
+        "dry_run": dry_run,
+        "review_ids": [review.pk for review in created],
+        "errors": [{"row": number, "errors": errors[number]} for number in sorted(errors)],
+    }
@@ -1,63 +1,63 @@
+import os
+
 from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import serializers, status, views
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import HybridPagination
 from apps.rents.models import Rent
 from apps.tenants.filters import TenantFilter
 from apps.tenants.models import Review, Tenant
+from apps.tenants.utils import IMPORT_FORMATS, import_reviews, parse_review_rows
+from apps.units.models import Unit
 
 from .serializers import ReviewSerializer, TenantDetailSerializer, TenantListSerializer
 
 
-class TenantViewSet(ModelViewSet):
-    queryset = Tenant.objects.all().prefetch_related(
-        Prefetch(
-            "rents",
-            queryset=Rent.objects.select_related("unit", "tenant").order_by("-rent_start", "-id"),
+class TenantPagination(HybridPagination):
+    ordering = ("-created_at", "-id")
+
+
+class TenantViewSet(ConditionalGetMixin, ModelViewSet):
+    """
+    Tenant status follows their rents: recomputed in bulk after rent writes and by the daily
+    `manage.py sync_tenant_statuses` sweep; reads have no side effects.
+    """
+
+    queryset = (
+        Tenant.objects.all()
+        .order_by("-created_at", "-id")
+        .prefetch_related(
+            Prefetch(
+                "rents",
+                queryset=Rent.objects.select_related("unit", "tenant").order_by("-rent_start", "-id"),
+            )
         )
     )
     serializer_class = TenantListSerializer
-    # Allow filtering by the existing TenantFilter and searching by tenant name or unit name
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    search_fields = ["full_name", "rents__unit__name"]
+    # TenantFilter's ?search= matches tenant and unit names through the search index
+    filter_backends = [DjangoFilterBackend]
     filterset_class = TenantFilter
     permission_classes = [IsAdminUser]
+    pagination_class = TenantPagination
+    conditional_models = (Tenant, Rent, Unit, Review)
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return TenantDetailSerializer
         return TenantListSerializer
 
-    # Ensure tenant status is fresh on every GET
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        items = page if page is not None else list(queryset)
-
-        for tenant in items:
-            try:
-                tenant.update_status()
-            except Exception:
-                pass
-
-        serializer = self.get_serializer(items, many=True)
-        if page is not None:
-            return self.get_paginated_response(serializer.data)
-        return Response(serializer.data)
-
-    def retrieve(self, request, *args, **kwargs):
-        # Prefetch reviews for detail view
-        self.queryset = self.queryset.prefetch_related(Prefetch("reviews", queryset=Review.objects.order_by("-created_at", "-id")))
-        instance = self.get_object()
-        try:
-            instance.update_status()
-        except Exception:
-            pass
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "action", None) == "retrieve":
+            # Reviews are only shown on the detail view
+            queryset = queryset.prefetch_related(Prefetch("reviews", queryset=Review.objects.order_by("-created_at", "-id")))
+        return queryset
 
 
 class ReviewViewSet(ModelViewSet):
@@ -67,17 +67,38 @@ class ReviewViewSet(ModelViewSet):
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_fields = ["tenant"]
     search_fields = ["tenant__full_name", "comment"]
+    # Tenant review aggregates (review_count, rating_sum, rate) are adjusted by Review.save/delete
+
+
+class ReviewImportView(views.APIView):
+    """
+    Bulk-create reviews from a JSON body (a list, or {"reviews": [...]}) or an uploaded `file` (.csv / .json).
+    Valid rows are inserted and each tenant's rating is adjusted once; ?dry_run=true only validates.
+    """
 
-    def perform_create(self, serializer):
-        review = serializer.save()
-        # recalc is handled by model save, but keep explicit for clarity
-        review.tenant.recalc_rate()
+    permission_classes = [IsAdminUser]
+    MAX_ROWS = 5000
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is not None:
+            file_format = os.path.splitext(upload.name)[1].lstrip(".").lower()
+            if file_format not in IMPORT_FORMATS:
+                raise serializers.ValidationError({"file": f"Unsupported file type; use one of: {', '.join(IMPORT_FORMATS)}."})
+            try:
+                rows = parse_review_rows(upload.read(), file_format)
+            except (ValueError, UnicodeDecodeError) as exc:
+                raise serializers.ValidationError({"file": str(exc)})
+        else:
+            rows = request.data.get("reviews") if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                raise serializers.ValidationError({"reviews": 'Send a list of reviews, {"reviews": [...]} or a CSV/JSON `file`.'})
 
-    def perform_update(self, serializer):
-        review = serializer.save()
-        review.tenant.recalc_rate()
+        if not rows:
+            raise serializers.ValidationError({"reviews": "No rows to import."})
+        if len(rows) > self.MAX_ROWS:
+            raise serializers.ValidationError({"reviews": f"At most {self.MAX_ROWS} rows per request; use `manage.py import_reviews` for larger files."})
 
-    def perform_destroy(self, instance):
-        tenant = instance.tenant
-        instance.delete()
-        tenant.recalc_rate()
+        dry_run = str(request.query_params.get("dry_run", "")).lower() in ("1", "true", "yes")
+        report = import_reviews(rows, dry_run=dry_run)
+        return Response(report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_200_OK)
@@ -8,7 +8,8 @@ class UnitFilter(filters.FilterSet):
     """
     FilterSet for Unit list filtering.
     Supports:
-    - Filtering by type, city, district, and status.
+    - Filtering by type, city, district, status and bedrooms.
+    - Filtering by bedrooms range (min_bedrooms / max_bedrooms) and daily price range (min_price / max_price)
     - Filtering by rent date window (from_date/to_date)
     - Filtering by owner lease_start and lease_end (lease_from / lease_to)
     """
@@ -17,10 +18,14 @@ class UnitFilter(filters.FilterSet):
     to_date = filters.CharFilter(method="filter_to_date", label="To Date")
     lease_from = filters.DateFilter(field_name="lease_start", lookup_expr="gte")
     lease_to = filters.DateFilter(field_name="lease_end", lookup_expr="lte")
+    min_bedrooms = filters.NumberFilter(field_name="bedrooms", lookup_expr="gte")
+    max_bedrooms = filters.NumberFilter(field_name="bedrooms", lookup_expr="lte")
+    min_price = filters.NumberFilter(field_name="price_per_day", lookup_expr="gte")
+    max_price = filters.NumberFilter(field_name="price_per_day", lookup_expr="lte")
 
     class Meta:
         model = Unit
-        fields = ["type", "city", "district", "status", "lease_from", "lease_to"]
+        fields = ["type", "city", "district", "status", "bedrooms", "lease_from", "lease_to"]
 
     def filter_from_date(self, queryset, name, value):
         """
@@ -0,0 +1,98 @@
+"""
+Coordinates for units without PostGIS.
+
+Map links (Google / Apple Maps) usually carry the point they show; it is parsed when a unit is saved
+and stored in plain, indexed latitude / longitude columns. Radius and nearest-k searches first narrow
+candidates with a bounding box on those columns (an index range scan on any database) and then keep
+the exact great-circle (haversine) distance in Python.
+"""
+
+import math
+import re
+from urllib.parse import parse_qs, unquote_plus, urlsplit
+
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+_NUMBER = r"[-+]?\d{1,3}(?:\.\d+)?"
+_PAIR_RE = re.compile(rf"^\s*({_NUMBER})\s*,\s*({_NUMBER})\s*$")
+# Google place data: ...!3d<lat>!4d<lng> (the place itself, preferred over the viewport centre)
+_PLACE_RE = re.compile(rf"!3d({_NUMBER})!4d({_NUMBER})")
+# Viewport centre: /@<lat>,<lng>,<zoom>z
+_VIEWPORT_RE = re.compile(rf"/@({_NUMBER}),({_NUMBER})")
+# Query parameters that hold "lat,lng" (Google: q/query/destination/center, Apple: ll/q/coordinate/sll/daddr)
+_COORDINATE_PARAMS = ("query", "q", "ll", "coordinate", "destination", "center", "sll", "daddr")
+
+
+def _valid(lat, lng):
+    lat, lng = float(lat), float(lng)
+    if -90 <= lat <= 90 and -180 <= lng <= 180:
+        return lat, lng
+    return None
+
+
+def parse_map_coordinates(url):
+    """
+    (latitude, longitude) found in a Google / Apple Maps link, or None (e.g. short links such as
+    maps.app.goo.gl, which only resolve over the network).
+    """
+    if not url:
+        return None
+    parts = urlsplit(url)
+    path = unquote_plus(parts.path)
+
+    match = _PLACE_RE.search(path)
+    if match:
+        return _valid(*match.groups())
+
+    params = parse_qs(parts.query)
+    for name in _COORDINATE_PARAMS:
+        for value in params.get(name, []):
+            match = _PAIR_RE.match(value)
+            if match:
+                return _valid(*match.groups())
+
+    match = _VIEWPORT_RE.search(path)
+    if match:
+        return _valid(*match.groups())
+
+    # /maps/place/<lat>,<lng> or /maps/search/<lat>,<lng>
+    for segment in path.split("/"):
+        match = _PAIR_RE.match(segment)
+        if match:
+            return _valid(*match.groups())
+    return None
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km, lat_field="latitude", lng_field="longitude") -> Q:
+    """
+    Filter for every point that can lie within radius_km of (lat, lng): a latitude band plus a longitude
+    range (split in two across the antimeridian, dropped near the poles). Superset of the circle.
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    condition = Q(**{f"{lat_field}__gte": max(-90.0, lat - d_lat), f"{lat_field}__lte": min(90.0, lat + d_lat)})
+
+    cos_lat = math.cos(math.radians(min(90.0, abs(lat) + d_lat)))
+    if cos_lat <= 1e-9:
+        return condition
+    d_lng = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if d_lng >= 180:
+        return condition
+
+    west, east = lng - d_lng, lng + d_lng
+    if west < -180:
+        return condition & (Q(**{f"{lng_field}__gte": west + 360}) | Q(**{f"{lng_field}__lte": east}))
+    if east > 180:
+        return condition & (Q(**{f"{lng_field}__gte": west}) | Q(**{f"{lng_field}__lte": east - 360}))
+    return condition & Q(**{f"{lng_field}__gte": west, f"{lng_field}__lte": east})
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.units.utils import refresh_unit_coordinates
+
+
+class Command(BaseCommand):
+    help = "Parse latitude/longitude from every unit's location_url (backfill for units saved before coordinates were stored)."
+
+    def handle(self, *args, **options):
+        updated = refresh_unit_coordinates()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt unit coordinates: {updated} units updated."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.units.models import Unit
+from apps.units.utils import refresh_image_manifests
+
+
+class Command(BaseCommand):
+    help = "Rebuild every unit's cover image URL and image URL manifest from its UnitImage rows (after imports or a storage change)."
+
+    def handle(self, *args, **options):
+        manifests = refresh_image_manifests(Unit.objects.values_list("pk", flat=True))
+        images = sum(len(urls) for urls in manifests.values())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt image manifests: {len(manifests)} units, {images} images."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.units.utils import sync_unit_statuses
+
+
+class Command(BaseCommand):
+    help = "Set units to occupied/available from today's rents in one set-based update (maintenance is kept). Run daily after midnight."
+
+    def handle(self, *args, **options):
+        updated = sync_unit_statuses()
+        self.stdout.write(self.style.SUCCESS(f"Synced unit statuses: {updated} units updated."))
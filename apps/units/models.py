@@ -7,7 +7,10 @@ from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from apps.core.models import City, District
+from apps.core.search import index_saved, remove_objects
 from apps.owners.models import Owner
+from apps.payments.cache import bump_summary_versions
+from apps.units.geo import parse_map_coordinates
 from config.choices import UNIT_TYPES, Status
 from config.validation import validate_map_url
 
@@ -45,6 +48,20 @@ class Unit(models.Model):
     )
     lease_start = models.DateField(default=date.today)
     lease_end = models.DateField(default=date.today)
+    # Change marker for conditional GETs; set-based updates must set it explicitly
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Denormalized from UnitImage by apps.units.utils.refresh_image_manifests: image URLs in upload order and the first one
+    image_urls = models.JSONField(default=list, blank=True, editable=False)
+    cover_image_url = models.CharField(max_length=500, blank=True, null=True, editable=False)
+    # Parsed from location_url on save (apps.units.geo); None when the link carries no coordinates
+    latitude = models.FloatField(blank=True, null=True, editable=False)
+    longitude = models.FloatField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Bounding-box pre-filter of the nearby search
+            models.Index(fields=["latitude", "longitude"], name="unit_lat_lng_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -57,7 +74,30 @@ class Unit(models.Model):
     def save(self, *args, **kwargs):
         # Validate model before saving
         self.full_clean()
+        self.latitude, self.longitude = parse_map_coordinates(self.location_url) or (None, None)
+        previous = None
+        if self.pk is not None:
+            previous = type(self).objects.filter(pk=self.pk).values_list("owner_percentage", "owner_id").first()
         super().save(*args, **kwargs)
+        index_saved("unit", self, kwargs.get("update_fields"))
+
+        from apps.notifications.utils import notify_lease_ending
+
+        notify_lease_ending(self)
+
+        # Ledger shares are split with owner_percentage, so re-split them when it changes
+        if previous is not None and previous[0] != self.owner_percentage:
+            from apps.payments.models import UnitMonthlyLedger
+
+            UnitMonthlyLedger.reprice(self.pk, self.owner_percentage)
+        bump_summary_versions(unit_ids=[self.pk], owner_ids=[self.owner_id, previous[1] if previous else None])
+
+    def delete(self, *args, **kwargs):
+        unit_id, owner_id = self.pk, self.owner_id
+        result = super().delete(*args, **kwargs)
+        remove_objects("unit", [unit_id])
+        bump_summary_versions(unit_ids=[unit_id], owner_ids=[owner_id])
+        return result
 
     def update_status(self):
         """
@@ -66,32 +106,12 @@ class Unit(models.Model):
         - If there is no active rent today and current status is OCCUPIED => revert to AVAILABLE.
         - If status is IN_MAINTENANCE => keep it as is regardless of active rent.
         Does NOT modify lease_start/lease_end.
+        Many units at once: apps.units.utils.sync_unit_statuses (same rules, set-based).
         """
-        from django.utils import timezone
-
-        from apps.rents.models import Rent
+        from apps.units.utils import sync_unit_statuses
 
-        today = timezone.now().date()
-        active = Rent.objects.filter(
-            unit=self,
-            rent_start__lte=today,
-            rent_end__gte=today,
-        ).exists()
-
-        # Keep maintenance as is
-        if self.status == Status.IN_MAINTENANCE:
-            return
-
-        # Determine new status
-        new_status = None
-        if active and self.status != Status.OCCUPIED:
-            new_status = Status.OCCUPIED
-        elif not active and self.status == Status.OCCUPIED:
-            new_status = Status.AVAILABLE
-
-        if new_status and self.status != new_status:
-            type(self).objects.filter(pk=self.pk).update(status=new_status)
-            self.status = new_status
+        if sync_unit_statuses(type(self).objects.filter(pk=self.pk)):
+            self.refresh_from_db(fields=["status", "updated_at"])
 
 
 class UnitImage(models.Model):
@@ -100,3 +120,61 @@ class UnitImage(models.Model):
 
     def __str__(self):
         return f"Image for {self.unit.name}"
+
+    def save(self, *args, **kwargs):
+        from apps.units.utils import refresh_image_manifests
+
+        super().save(*args, **kwargs)
+        refresh_image_manifests([self.unit_id])
+
+    def delete(self, *args, **kwargs):
+        from apps.units.utils import refresh_image_manifests
+
+        unit_id = self.unit_id
+        result = super().delete(*args, **kwargs)
+        refresh_image_manifests([unit_id])
+        return result
+
+
+class UnitRateRule(models.Model):
+    """
+    Seasonal / weekday nightly rate for one unit or for every unit of a type (apps.units.pricing).
+    Each night takes the matching rule with the highest priority (a unit rule beats a type rule on a
+    tie); nights without a matching rule are charged the unit's price_per_day.
+    """
+
+    unit = models.ForeignKey(Unit, related_name="rate_rules", on_delete=models.CASCADE, blank=True, null=True)
+    unit_type = models.CharField(max_length=20, choices=UNIT_TYPES, blank=True, null=True)
+    name = models.CharField(max_length=100)
+    # Inclusive; open-ended when empty
+    start_date = models.DateField(blank=True, null=True)
+    end_date = models.DateField(blank=True, null=True)
+    weekdays = models.JSONField(default=list, blank=True, help_text="Nights this rule applies to: 0=Monday ... 6=Sunday; empty means every night.")
+    nightly_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, validators=[MinValueValidator(Decimal("0.00"))])
+    multiplier = models.DecimalField(max_digits=5, decimal_places=3, blank=True, null=True, validators=[MinValueValidator(Decimal("0.000"))])
+    priority = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-priority", "id"]
+
+    def __str__(self):
+        return f"{self.name} ({self.unit or self.unit_type})"
+
+    def clean(self):
+        errors = {}
+        if (self.unit_id is None) == (not self.unit_type):
+            errors["unit"] = "Set either a unit or a unit_type."
+        if (self.nightly_price is None) == (self.multiplier is None):
+            errors["nightly_price"] = "Set either a nightly_price or a multiplier."
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            errors["end_date"] = "End date cannot be earlier than start date."
+        if not isinstance(self.weekdays, list) or any(not isinstance(day, int) or not 0 <= day <= 6 for day in self.weekdays):
+            errors["weekdays"] = "Weekdays must be a list of integers from 0 (Monday) to 6 (Sunday)."
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        self.full_clean()
+        super().save(*args, **kwargs)
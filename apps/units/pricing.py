@@ -0,0 +1,96 @@
+"""
+Stay quotes from UnitRateRule tables.
+
+A stay from check-in to check-out is charged per night (check-out night excluded). Units that share
+the same rules (same type, no unit-specific rules) share one per-night array of winning rules, built
+once per quote; from it come two sums - the nights with a fixed nightly_price and the multipliers
+of the other nights - so each unit's total is fixed_total + price_per_day * multiplier_total,
+whatever the number of nights.
+"""
+
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Q
+
+from apps.units.models import UnitRateRule
+
+TWO_PLACES = Decimal("0.01")
+ONE = Decimal("1")
+
+
+def _night_indexes(rule, check_in, nights, weekday_of_first):
+    """Indexes of the stay's nights covered by `rule` (date range and weekdays)."""
+    first = 0 if rule.start_date is None else max(0, (rule.start_date - check_in).days)
+    last = nights - 1 if rule.end_date is None else min(nights - 1, (rule.end_date - check_in).days)
+    if first > last:
+        return range(0)
+    if not rule.weekdays:
+        return range(first, last + 1)
+    days = set(rule.weekdays)
+    return [i for i in range(first, last + 1) if (weekday_of_first + i) % 7 in days]
+
+
+def rate_profile(rules, check_in, nights) -> dict:
+    """
+    Paint the winning rule of every night (rules applied from lowest to highest precedence) and
+    reduce the array to {fixed_total, multiplier_total, applied: [{id, name, nights}]}.
+    `rules` are (is_unit_rule, rule) pairs.
+    """
+    winners = [None] * nights
+    weekday_of_first = check_in.weekday()
+    for _, rule in sorted(rules, key=lambda pair: (pair[1].priority, pair[0], -pair[1].id)):
+        for i in _night_indexes(rule, check_in, nights, weekday_of_first):
+            winners[i] = rule
+
+    fixed_total = sum((rule.nightly_price for rule in winners if rule is not None and rule.nightly_price is not None), Decimal("0"))
+    multiplier_total = sum((ONE if rule is None else rule.multiplier for rule in winners if rule is None or rule.nightly_price is None), Decimal("0"))
+    counts = Counter(rule.id for rule in winners if rule is not None)
+    by_id = {rule.id: rule for _, rule in rules}
+    applied = [{"id": rule_id, "name": by_id[rule_id].name, "nights": count} for rule_id, count in sorted(counts.items())]
+    return {"fixed_total": fixed_total, "multiplier_total": multiplier_total, "applied": applied}
+
+
+def quote_units(units, check_in, check_out) -> dict:
+    """
+    {unit_id: {nights, price_per_day, base_total, total, adjustment, average_nightly, applied_rules}}
+    for a stay from check_in to check_out (check_out > check_in). One query for the rules of all units.
+    """
+    units = list(units)
+    nights = (check_out - check_in).days
+    last_night = check_out - timedelta(days=1)
+    rules = UnitRateRule.objects.filter(
+        Q(unit_id__in=[unit.pk for unit in units]) | Q(unit_type__in={unit.type for unit in units}),
+        Q(start_date__isnull=True) | Q(start_date__lte=last_night),
+        Q(end_date__isnull=True) | Q(end_date__gte=check_in),
+    )
+    type_rules, unit_rules = {}, {}
+    for rule in rules:
+        if rule.unit_id is not None:
+            unit_rules.setdefault(rule.unit_id, []).append((True, rule))
+        else:
+            type_rules.setdefault(rule.unit_type, []).append((False, rule))
+
+    profiles = {}
+    quotes = {}
+    for unit in units:
+        # Units without their own rules share their type's profile
+        key = (unit.type, unit.pk if unit.pk in unit_rules else None)
+        if key not in profiles:
+            profiles[key] = rate_profile(type_rules.get(unit.type, []) + unit_rules.get(unit.pk, []), check_in, nights)
+        profile = profiles[key]
+
+        price = unit.price_per_day or Decimal("0")
+        base_total = (price * nights).quantize(TWO_PLACES)
+        total = (profile["fixed_total"] + price * profile["multiplier_total"]).quantize(TWO_PLACES)
+        quotes[unit.pk] = {
+            "nights": nights,
+            "price_per_day": price,
+            "base_total": base_total,
+            "total": total,
+            "adjustment": total - base_total,
+            "average_nightly": (total / nights).quantize(TWO_PLACES) if nights else Decimal("0.00"),
+            "applied_rules": profile["applied"],
+        }
+    return quotes
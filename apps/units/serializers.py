@@ -1,16 +1,122 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from rest_framework.serializers import ImageField
 
 from apps.owners.models import Owner
 from apps.payments import utils as pay_utils
+from apps.payments.cache import cached_summary, unit_scope
 from apps.payments.serializers import OccasionalPaymentSimpleSerializer
-from apps.units.models import Unit, UnitImage
+from apps.units.models import Unit, UnitImage, UnitRateRule
+from apps.units.storage import image_url
+from apps.units.utils import add_unit_images, free_intervals, replace_unit_images, units_rent_history
+from config.choices import Status
 
+# Optional, expensive parts of a unit payload, selected with ?include=a,b (in this output order)
+UNIT_SECTIONS = ("images", "payments_summary", "unit_payment_summary", "rent_payment_history")
 
-class UnitListSerializer(serializers.ModelSerializer):
+
+def parse_unit_sections(value: str) -> tuple:
+    """Validate a comma separated ?include= value; returns the selected sections in UNIT_SECTIONS order."""
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = sorted(names - set(UNIT_SECTIONS))
+    if unknown:
+        raise serializers.ValidationError({"include": f"Unknown section(s): {', '.join(unknown)}. Choose from: {', '.join(UNIT_SECTIONS)}."})
+    return tuple(name for name in UNIT_SECTIONS if name in names)
+
+
+def _occasional_payload(summary: dict) -> dict:
+    return {
+        "total_occasional_payment": f"{summary['total_occasional_payment']:.2f}",
+        "total_occasional_payment_last_month": f"{summary['total_occasional_payment_last_month']:.2f}",
+        "last_month_payments": OccasionalPaymentSimpleSerializer(summary["last_month_payments"], many=True).data,
+    }
+
+
+def build_unit_sections(units: list, sections) -> dict:
+    """
+    {unit_id: {section: payload}} for the requested sections. A fixed number of queries per
+    section, whatever the number of units; a single unit reads its summaries from the versioned cache.
+    """
+    result = {unit.pk: {} for unit in units}
+    if not units or not sections:
+        return result
+    unit_ids = list(result)
+    single = units[0] if len(units) == 1 else None
+
+    if "images" in sections:
+        # Denormalized manifest, no image query
+        for unit in units:
+            result[unit.pk]["images"] = list(unit.image_urls)
+
+    if "payments_summary" in sections:
+        if single is not None:
+            payloads = {
+                single.pk: cached_summary(
+                    "unit-occasional",
+                    [unit_scope(single.pk)],
+                    lambda: _occasional_payload(pay_utils.units_payments_summaries([single.pk])[single.pk]),
+                )
+            }
+        else:
+            payloads = {uid: _occasional_payload(summary) for uid, summary in pay_utils.units_payments_summaries(unit_ids).items()}
+        for uid in unit_ids:
+            result[uid]["payments_summary"] = payloads[uid]
+
+    if "unit_payment_summary" in sections:
+        if single is not None:
+            summaries = {single.pk: pay_utils.cached_unit_payment_summary(single.pk)}
+        else:
+            summaries = pay_utils.calculate_unit_payment_summaries(units)
+        for uid in unit_ids:
+            result[uid]["unit_payment_summary"] = summaries[uid]
+
+    if "rent_payment_history" in sections:
+        for uid, history in units_rent_history(unit_ids).items():
+            result[uid]["rent_payment_history"] = history
+
+    return result
+
+
+class UnitSectionsListSerializer(serializers.ListSerializer):
+    """Builds the requested sections for every unit of the list (or page) at once before rendering rows."""
+
+    def to_representation(self, data):
+        units = list(data.all() if hasattr(data, "all") else data)
+        self.child.unit_sections = build_unit_sections(units, self.child.get_sections())
+        return super().to_representation(units)
+
+
+class UnitSectionsMixin:
+    """
+    Adds the UNIT_SECTIONS chosen by context["include"] (parsed ?include=) to each unit.
+    Without ?include=, a single unit gets `default_sections` and lists get none.
+    Serializers using it set Meta.list_serializer_class = UnitSectionsListSerializer.
+    """
+
+    default_sections = ()
+    unit_sections = None
+
+    def get_sections(self):
+        include = self.context.get("include")
+        if include is not None:
+            return include
+        return () if self.parent is not None else self.default_sections
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        sections = self.unit_sections
+        if sections is None or instance.pk not in sections:
+            sections = build_unit_sections([instance], self.get_sections())
+        representation.update(sections[instance.pk])
+        return representation
+
+
+class UnitListSerializer(UnitSectionsMixin, serializers.ModelSerializer):
     city_name = serializers.CharField(source="city.name", read_only=True)
     district_name = serializers.CharField(source="district.name", read_only=True)
+    # Filled from the with_current_tenant() annotations of the list queryset
+    current_tenant_id = serializers.SerializerMethodField()
     current_tenant_name = serializers.SerializerMethodField()
+    current_rent_end = serializers.SerializerMethodField()
 
     class Meta:
         model = Unit
@@ -20,7 +126,9 @@ class UnitListSerializer(serializers.ModelSerializer):
             "location_text",
             "city_name",
             "district_name",
+            "current_tenant_id",
             "current_tenant_name",
+            "current_rent_end",
             "price_per_day",
             "type",
             "status",
@@ -28,29 +136,197 @@ class UnitListSerializer(serializers.ModelSerializer):
             "lease_end",
         ]
         read_only_fields = fields
+        list_serializer_class = UnitSectionsListSerializer
+
+    def get_current_tenant_id(self, obj: Unit):
+        return getattr(obj, "current_tenant_id", None)
 
     def get_current_tenant_name(self, obj: Unit):
-        ct = getattr(obj, "current_tenant", None)
-        return (ct or {}).get("name") if ct else None
+        return getattr(obj, "current_tenant_name", None)
+
+    def get_current_rent_end(self, obj: Unit):
+        rent_end = getattr(obj, "current_rent_end", None)
+        return rent_end.isoformat() if rent_end else None
+
+
+class UnitDateWindowQuerySerializer(serializers.Serializer):
+    """Validates ?from=&to= (both inclusive) for the availability and timeline endpoints."""
+
+    MAX_WINDOW_DAYS = 366
+
+    def get_fields(self):
+        # `from` is a Python keyword, so the date fields are declared here
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField()
+        fields["to"] = serializers.DateField()
+        return fields
+
+    def validate(self, attrs):
+        if attrs["to"] < attrs["from"]:
+            raise serializers.ValidationError({"to": "End date cannot be earlier than start date."})
+        if (attrs["to"] - attrs["from"]).days + 1 > self.MAX_WINDOW_DAYS:
+            raise serializers.ValidationError({"to": f"The window can span at most {self.MAX_WINDOW_DAYS} days."})
+        return attrs
+
+
+class UnitAvailabilityQuerySerializer(UnitDateWindowQuerySerializer):
+    fully_available = serializers.BooleanField(default=False)
+
+
+class UnitAvailabilitySerializer(serializers.ModelSerializer):
+    """Unit row with its free intervals inside the requested window; expects context busy={unit_id: [...]} and window=(from, to)."""
+
+    city_name = serializers.CharField(source="city.name", read_only=True)
+    district_name = serializers.CharField(source="district.name", read_only=True)
+    free_intervals = serializers.SerializerMethodField()
+    free_days = serializers.SerializerMethodField()
+    fully_available = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Unit
+        fields = [
+            "id",
+            "name",
+            "city_name",
+            "district_name",
+            "type",
+            "bedrooms",
+            "price_per_day",
+            "status",
+            "free_intervals",
+            "free_days",
+            "fully_available",
+        ]
+        read_only_fields = fields
+
+    def _free(self, obj: Unit):
+        window_start, window_end = self.context["window"]
+        return free_intervals(self.context["busy"].get(obj.pk, []), window_start, window_end)
+
+    def get_free_intervals(self, obj: Unit):
+        return [{"start": start, "end": end, "days": (end - start).days + 1} for start, end in self._free(obj)]
+
+    def get_free_days(self, obj: Unit):
+        return sum((end - start).days + 1 for start, end in self._free(obj))
 
+    def get_fully_available(self, obj: Unit):
+        window_start, window_end = self.context["window"]
+        return obj.status != Status.IN_MAINTENANCE and self._free(obj) == [(window_start, window_end)]
 
-class UnitSerializer(serializers.ModelSerializer):
+
+class UnitNearbyQuerySerializer(serializers.Serializer):
+    """?lat=&lng= plus ?radius_km= (optional) and ?limit= (nearest-k)."""
+
+    MAX_RADIUS_KM = 500
+    MAX_LIMIT = 200
+
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(required=False, min_value=0.01, max_value=MAX_RADIUS_KM)
+    limit = serializers.IntegerField(default=20, min_value=1, max_value=MAX_LIMIT)
+
+
+class UnitNearbySerializer(UnitListSerializer):
+    """Unit list row with its coordinates and distance; expects context distances={unit_id: km}."""
+
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(UnitListSerializer.Meta):
+        fields = UnitListSerializer.Meta.fields + ["latitude", "longitude", "distance_km"]
+        read_only_fields = fields
+
+    def get_distance_km(self, obj: Unit):
+        return round(self.context["distances"][obj.pk], 3)
+
+
+class UnitRateRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UnitRateRule
+        fields = "__all__"
+        read_only_fields = ("created_at", "updated_at")
+
+    def validate(self, attrs):
+        # Same rules as UnitRateRule.clean, reported as a 400 (partial updates merge the stored values)
+        rule = UnitRateRule(**{**({f.name: getattr(self.instance, f.name) for f in UnitRateRule._meta.concrete_fields} if self.instance else {}), **attrs})
+        try:
+            rule.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+        return attrs
+
+
+class UnitQuoteSerializer(UnitDateWindowQuerySerializer):
+    """Body of POST /units/quote/: a stay from `from` (check-in) to `to` (check-out) for the listed units."""
+
+    MAX_UNITS = 1000
+
+    units = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_UNITS)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs["to"] <= attrs["from"]:
+            raise serializers.ValidationError({"to": "Check-out must be after check-in."})
+        return attrs
+
+
+class AppliedRateRuleSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    nights = serializers.IntegerField()
+
+
+class UnitQuoteResultSerializer(serializers.Serializer):
+    unit_id = serializers.IntegerField()
+    unit_name = serializers.CharField()
+    nights = serializers.IntegerField()
+    price_per_day = serializers.DecimalField(max_digits=12, decimal_places=2)
+    base_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    adjustment = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_nightly = serializers.DecimalField(max_digits=12, decimal_places=2)
+    applied_rules = AppliedRateRuleSerializer(many=True)
+
+
+class UnitTimelineSerializer(serializers.ModelSerializer):
+    """
+    Unit row with its run-length encoded occupancy; expects context segments={unit_id: [...]}.
+    Each segment is [state, days, rent_id] and segments are consecutive from the window start.
+    """
+
+    segments = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Unit
+        fields = ["id", "name", "status", "segments"]
+        read_only_fields = fields
+
+    def get_segments(self, obj: Unit):
+        return self.context["segments"].get(obj.pk, [])
+
+
+class UnitSerializer(UnitSectionsMixin, serializers.ModelSerializer):
     images = serializers.ListField(child=serializers.ImageField(), write_only=True, required=False)
     owner = serializers.PrimaryKeyRelatedField(queryset=Owner.objects.all())
     bedrooms = serializers.IntegerField(required=True)
     bathrooms = serializers.IntegerField(required=True)
     area = serializers.IntegerField(required=True)
+    details = serializers.SerializerMethodField()
+
+    # A single unit keeps the full payload unless ?include= narrows it
+    default_sections = UNIT_SECTIONS
 
     class Meta:
         model = Unit
-        fields = "__all__"
+        # image_urls is served as the `images` section
+        exclude = ["image_urls"]
+        list_serializer_class = UnitSectionsListSerializer
 
     def create(self, validated_data):
         images = validated_data.pop("images", [])
         unit = super().create(validated_data)
 
-        for image in images:
-            UnitImage.objects.create(unit=unit, image=image)
+        # Concurrent uploads, one INSERT
+        add_unit_images(unit, images)
 
         unit.update_status()
         return unit
@@ -59,76 +335,37 @@ class UnitSerializer(serializers.ModelSerializer):
         images = validated_data.pop("images", None)
         unit = super().update(instance, validated_data)
 
+        # Sending `images` replaces the whole set; /units/{id}/images/ adds or removes single images
         if images is not None:
-            instance.images.all().delete()
-            for image in images:
-                UnitImage.objects.create(unit=unit, image=image)
+            replace_unit_images(unit, images)
 
         unit.update_status()
         return unit
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["details"] = {
-            "type": instance.type,
-            "bedrooms": instance.bedrooms,
-            "bathrooms": instance.bathrooms,
-            "area": instance.area,
+    def get_details(self, obj: Unit):
+        return {
+            "type": obj.type,
+            "bedrooms": obj.bedrooms,
+            "bathrooms": obj.bathrooms,
+            "area": obj.area,
         }
-        # Include related images
-        representation["images"] = [image.image.url for image in instance.images.all()]
-
-        # Add payments summary via utils (occasional payments quick summary)
-        try:
-            summary = pay_utils.unit_payments_summary(instance.id)
-            representation["payments_summary"] = {
-                "total_occasional_payment": f"{summary['total_occasional_payment']:.2f}",
-                "total_occasional_payment_last_month": f"{summary['total_occasional_payment_last_month']:.2f}",
-                "last_month_payments": OccasionalPaymentSimpleSerializer(summary["last_month_qs"], many=True).data,
-            }
-        except Exception:
-            representation["payments_summary"] = {
-                "total_occasional_payment": "0.00",
-                "total_occasional_payment_last_month": "0.00",
-                "last_month_payments": [],
-            }
-
-        # Embed full unit payment analytics (rent + deductions + shares) by calling the existing util
-        representation["unit_payment_summary"] = pay_utils.calculate_unit_payment_summary(instance.id)
-
-        # New: include rent payment history for this unit
-        try:
-            rents_qs = instance.rents.all().only("total_amount", "payment_date", "payment_status", "id").order_by("-payment_date", "-id")
-            history = []
-            for r in rents_qs:
-                # format amount with 2 decimals; date as ISO string
-                amount_str = f"{r.total_amount:.2f}" if r.total_amount is not None else "0.00"
-                # format date as yyyy-mm-dd (date-only)
-                if getattr(r, "payment_date", None):
-                    try:
-                        date_val = r.payment_date.date().isoformat()
-                    except Exception:
-                        date_val = r.payment_date.strftime("%Y-%m-%d")
-                else:
-                    date_val = None
-                status_val = getattr(r, "payment_status", None)
-                history.append(
-                    {
-                        "amount": amount_str,
-                        "date": date_val,
-                        "status": status_val,
-                    }
-                )
-            representation["rent_payment_history"] = history
-        except Exception:
-            representation["rent_payment_history"] = []
-
-        return representation
 
 
 class UnitImageSerializer(serializers.ModelSerializer):
-    image = ImageField()
+    image = serializers.SerializerMethodField()
 
     class Meta:
         model = UnitImage
         fields = ["id", "unit", "image"]
+        read_only_fields = fields
+
+    def get_image(self, obj: UnitImage):
+        return image_url(obj.image)
+
+
+class UnitImageUploadSerializer(serializers.Serializer):
+    """Multipart body of POST /units/{id}/images/: one or more `images` files, added to the unit's set."""
+
+    MAX_IMAGES = 50
+
+    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False, max_length=MAX_IMAGES)
@@ -0,0 +1,115 @@
+"""
+Pluggable storage for unit images.
+
+UnitImage.image is a CloudinaryField, i.e. a reference like "image/upload/v123/<public_id>.jpg".
+Backends upload a file and hand back that reference (a CloudinaryResource), so rows can be written
+with bulk_create without the field uploading again, and turn a stored reference back into a URL.
+settings.UNIT_IMAGE_STORAGE picks the backend: Cloudinary in production, the local filesystem
+(MEDIA_ROOT) for development and tests.
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from cloudinary import CloudinaryResource, uploader
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+
+
+class ImageStorage:
+    """Backend interface: save(file) -> CloudinaryResource, url(resource) -> str, delete(resource)."""
+
+    def save(self, file) -> CloudinaryResource:
+        raise NotImplementedError
+
+    def url(self, resource) -> str:
+        raise NotImplementedError
+
+    def delete(self, resource) -> None:
+        raise NotImplementedError
+
+
+class CloudinaryImageStorage(ImageStorage):
+    """Uploads with the same options CloudinaryField uses for unsaved files."""
+
+    def save(self, file) -> CloudinaryResource:
+        if hasattr(file, "seekable") and file.seekable():
+            file.seek(0)
+        return uploader.upload_resource(file, type="upload", resource_type="image")
+
+    def url(self, resource) -> str:
+        return resource.url
+
+    def delete(self, resource) -> None:
+        uploader.destroy(resource.public_id, type=resource.type, resource_type=resource.resource_type)
+
+
+class LocalImageStorage(ImageStorage):
+    """Stores files under MEDIA_ROOT/units/ and serves them from MEDIA_URL; no network access."""
+
+    folder = "units"
+
+    def __init__(self):
+        self.storage = FileSystemStorage(location=os.path.join(settings.MEDIA_ROOT, self.folder), base_url=f"{settings.MEDIA_URL}{self.folder}/")
+
+    def _name(self, resource) -> str:
+        public_id = resource.public_id.removeprefix(f"{self.folder}/")
+        return f"{public_id}.{resource.format}" if resource.format else public_id
+
+    def save(self, file) -> CloudinaryResource:
+        extension = os.path.splitext(getattr(file, "name", "") or "")[1].lower() or ".jpg"
+        name = self.storage.save(f"{uuid.uuid4().hex}{extension}", file)
+        public_id, extension = os.path.splitext(name)
+        return CloudinaryResource(f"{self.folder}/{public_id}", format=extension.lstrip(".") or None, type="upload", resource_type="image")
+
+    def url(self, resource) -> str:
+        return self.storage.url(self._name(resource))
+
+    def delete(self, resource) -> None:
+        self.storage.delete(self._name(resource))
+
+
+@lru_cache(maxsize=None)
+def get_image_storage() -> ImageStorage:
+    return import_string(settings.UNIT_IMAGE_STORAGE)()
+
+
+def image_url(resource) -> str | None:
+    """URL of a stored UnitImage.image reference through the configured backend."""
+    if not resource:
+        return None
+    return get_image_storage().url(resource)
+
+
+def upload_images(files) -> list:
+    """
+    Upload files concurrently (at most settings.UNIT_IMAGE_UPLOAD_WORKERS at a time) and return their
+    references in input order. If any upload fails, the ones that succeeded are removed again and the
+    error is raised.
+    """
+    files = list(files)
+    if not files:
+        return []
+    storage = get_image_storage()
+    with ThreadPoolExecutor(max_workers=min(settings.UNIT_IMAGE_UPLOAD_WORKERS, len(files))) as pool:
+        futures = [pool.submit(storage.save, file) for file in files]
+    outcomes = [(future.exception(), future) for future in futures]
+    errors = [error for error, _ in outcomes if error is not None]
+    resources = [future.result() for error, future in outcomes if error is None]
+    if errors:
+        delete_images(resources)
+        raise errors[0]
+    return resources
+
+
+def delete_images(resources) -> None:
+    """Best-effort removal of stored files (rows are already gone; a leftover file only costs storage)."""
+    storage = get_image_storage()
+    for resource in resources:
+        try:
+            storage.delete(resource)
+        except Exception:
+            continue
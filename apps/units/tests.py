@@ -1 +1,74 @@
-# Create your tests here.
+import os
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.core.tests import create_unit
+from apps.owners.models import Owner
+from apps.units.storage import LocalImageStorage, get_image_storage, upload_images
+from apps.units.utils import add_unit_images, replace_unit_images
+
+
+def image(name):
+    return SimpleUploadedFile(name, b"\xff\xd8\xff\xe0 not really a jpeg", content_type="image/jpeg")
+
+
+class UnitImageStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.folder = os.path.join(media_root.name, LocalImageStorage.folder)
+        settings_override = override_settings(UNIT_IMAGE_STORAGE="apps.units.storage.LocalImageStorage", MEDIA_ROOT=media_root.name, UNIT_IMAGE_UPLOAD_WORKERS=3)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_image_storage.cache_clear()
+        self.addCleanup(get_image_storage.cache_clear)
+        self.unit = create_unit("A-101", Owner.objects.create(full_name="Owner", phone="0100"))
+
+    def stored_files(self):
+        return sorted(os.listdir(self.folder)) if os.path.isdir(self.folder) else []
+
+    def failing_on(self, name):
+        save = LocalImageStorage.save
+
+        def fake_save(storage, file):
+            if file.name == name:
+                raise OSError(f"upload of {name} failed")
+            return save(storage, file)
+
+        return mock.patch.object(LocalImageStorage, "save", autospec=True, side_effect=fake_save)
+
+    def test_batch_upload_stores_every_file(self):
+        files = [image(f"{index}.png") for index in range(5)]
+        resources = upload_images(files)
+        self.assertEqual(len(resources), 5)
+        self.assertTrue(all(resource.format == "png" for resource in resources))
+        self.assertEqual(self.stored_files(), sorted(f"{resource.public_id.split('/')[-1]}.png" for resource in resources))
+
+        images = add_unit_images(self.unit, [image("a.jpg"), image("b.jpg")])
+        self.assertEqual([img.pk for img in self.unit.images.order_by("pk")], [img.pk for img in images])
+        self.unit.refresh_from_db()
+        self.assertEqual(len(self.unit.image_urls), 2)
+        self.assertTrue(self.unit.cover_image_url.startswith("/media/units/"))
+
+    def test_failed_upload_removes_the_uploaded_ones(self):
+        with self.failing_on("bad.jpg"), self.assertRaises(OSError):
+            upload_images([image("a.jpg"), image("bad.jpg"), image("c.jpg")])
+        self.assertEqual(self.stored_files(), [])
+
+    def test_replace_keeps_the_old_set_when_an_upload_fails(self):
+        old = add_unit_images(self.unit, [image("old.jpg")])
+        old_files = self.stored_files()
+
+        with self.failing_on("bad.jpg"), self.assertRaises(OSError):
+            replace_unit_images(self.unit, [image("new.jpg"), image("bad.jpg")])
+        self.assertEqual(list(self.unit.images.values_list("pk", flat=True)), [old[0].pk])
+        self.assertEqual(self.stored_files(), old_files)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new = replace_unit_images(self.unit, [image("new.jpg")])
+        self.assertEqual(list(self.unit.images.values_list("pk", flat=True)), [new[0].pk])
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertNotEqual(self.stored_files(), old_files)
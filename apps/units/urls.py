@@ -1,9 +1,11 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from apps.units.views import UnitViewSet
+from apps.units.views import UnitRateRuleViewSet, UnitViewSet
 
 router = DefaultRouter()
+# Register 'units/rate-rules' BEFORE 'units' so the unit detail route doesn't shadow it
+router.register(r"units/rate-rules", UnitRateRuleViewSet, basename="unit-rate-rule")
 router.register(r"units", UnitViewSet, basename="unit")
 
 urlpatterns = [
@@ -0,0 +1,268 @@
+import math
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+
+from apps.rents.models import Rent
+from apps.units.geo import EARTH_RADIUS_KM, bounding_box, haversine_km, parse_map_coordinates
+from apps.units.models import Unit, UnitImage
+from apps.units.storage import delete_images, image_url, upload_images
+from config.choices import Status
+
+ONE_DAY = timedelta(days=1)
+
+# Occupancy timeline states
+FREE = "free"
+OCCUPIED = "occupied"
+MAINTENANCE = "maintenance"
+
+
+def sync_unit_statuses(queryset=None, today=None) -> int:
+    """
+    Set-based version of Unit.update_status for every unit in `queryset` (default: all units):
+    units with a rent covering today become OCCUPIED, occupied units without one become AVAILABLE,
+    IN_MAINTENANCE units are left alone. Two UPDATE statements with an EXISTS subquery, whatever
+    the number of units; returns the number of units changed.
+    """
+    queryset = Unit.objects.all() if queryset is None else queryset
+    today = today or timezone.now().date()
+    has_active_rent = Exists(Rent.objects.filter(unit=OuterRef("pk"), rent_start__lte=today, rent_end__gte=today))
+    candidates = queryset.exclude(status=Status.IN_MAINTENANCE)
+    now = timezone.now()
+    occupied = candidates.filter(has_active_rent).exclude(status=Status.OCCUPIED).update(status=Status.OCCUPIED, updated_at=now)
+    freed = candidates.filter(~has_active_rent, status=Status.OCCUPIED).update(status=Status.AVAILABLE, updated_at=now)
+    return occupied + freed
+
+
+def with_current_tenant(queryset, today=None):
+    """
+    Annotate units with the rent covering today (same rule as sync_unit_statuses):
+    current_tenant_id, current_tenant_name and current_rent_end, None when the unit is free.
+    Correlated subqueries, so the unit list stays a single query.
+    """
+    today = today or timezone.now().date()
+    current_rent = Rent.objects.filter(unit=OuterRef("pk"), rent_start__lte=today, rent_end__gte=today).order_by("-rent_start", "-id")[:1]
+    return queryset.annotate(
+        current_tenant_id=Subquery(current_rent.values("tenant_id")),
+        current_tenant_name=Subquery(current_rent.values("tenant__full_name")),
+        current_rent_end=Subquery(current_rent.values("rent_end")),
+    )
+
+
+def merge_intervals(intervals) -> list:
+    """
+    Merge closed [start, end] date intervals sorted by start. Intervals that overlap or touch
+    (next start is the day after the current end) collapse into one.
+    """
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def free_intervals(busy, window_start, window_end) -> list:
+    """Complement of merged, sorted busy intervals within the closed window [window_start, window_end]."""
+    free = []
+    cursor = window_start
+    for start, end in busy:
+        if start > cursor:
+            free.append((cursor, min(start - ONE_DAY, window_end)))
+        cursor = max(cursor, end + ONE_DAY)
+        if cursor > window_end:
+            break
+    if cursor <= window_end:
+        free.append((cursor, window_end))
+    return free
+
+
+def rents_in_window(unit_ids, window_start, window_end):
+    """Rents of these units overlapping the closed window, ordered by unit then start (one query)."""
+    return Rent.objects.filter(unit_id__in=unit_ids, rent_start__lte=window_end, rent_end__gte=window_start).order_by("unit_id", "rent_start", "rent_end")
+
+
+def units_busy_intervals(unit_ids, window_start, window_end) -> dict:
+    """{unit_id: merged busy intervals clipped to the window} from a single ordered rent query."""
+    by_unit = {pk: [] for pk in unit_ids}
+    for unit_id, start, end in rents_in_window(unit_ids, window_start, window_end).values_list("unit_id", "rent_start", "rent_end"):
+        by_unit[unit_id].append((max(start, window_start), min(end, window_end)))
+    return {pk: merge_intervals(intervals) for pk, intervals in by_unit.items()}
+
+
+def _days(start, end):
+    return (end - start).days + 1
+
+
+def occupancy_segments(rents, window_start, window_end, in_maintenance=False, today=None) -> list:
+    """
+    Run-length encode one unit's occupancy over the closed window as [state, days, rent_id] segments.
+    `rents` are (rent_id, rent_start, rent_end) sorted by start; a day covered by several rents keeps
+    the earliest one. Unit status is only known for the present, so an in-maintenance unit shows its
+    free days from today onwards as maintenance.
+    """
+    today = today or timezone.now().date()
+    segments = []
+
+    def push(state, start, end, rent_id=None):
+        if state == FREE and in_maintenance and end >= today:
+            if start < today:
+                push(FREE, start, today - ONE_DAY)
+                start = today
+            state = MAINTENANCE
+        if segments and segments[-1][0] == state and segments[-1][2] == rent_id:
+            segments[-1][1] += _days(start, end)
+        else:
+            segments.append([state, _days(start, end), rent_id])
+
+    cursor = window_start
+    for rent_id, start, end in rents:
+        start, end = max(start, cursor), min(end, window_end)
+        if end < start:
+            continue
+        if start > cursor:
+            push(FREE, cursor, start - ONE_DAY)
+        push(OCCUPIED, start, end, rent_id)
+        cursor = end + ONE_DAY
+    if cursor <= window_end:
+        push(FREE, cursor, window_end)
+    return segments
+
+
+def units_occupancy(units, window_start, window_end) -> dict:
+    """{unit_id: occupancy_segments(...)} for many units from a single ordered rent query."""
+    rents_by_unit = {unit.pk: [] for unit in units}
+    for unit_id, rent_id, start, end in rents_in_window(list(rents_by_unit), window_start, window_end).values_list("unit_id", "id", "rent_start", "rent_end"):
+        rents_by_unit[unit_id].append((rent_id, start, end))
+    today = timezone.now().date()
+    return {unit.pk: occupancy_segments(rents_by_unit[unit.pk], window_start, window_end, in_maintenance=unit.status == Status.IN_MAINTENANCE, today=today) for unit in units}
+
+
+def units_rent_history(unit_ids) -> dict:
+    """
+    Rent payment history of many units with one query: {unit_id: [{amount, date, status}, ...]},
+    most recent payment_date first; every requested unit gets an entry.
+    """
+    history = {uid: [] for uid in unit_ids}
+    if not history:
+        return history
+    rows = Rent.objects.filter(unit_id__in=list(history)).order_by("unit_id", "-payment_date", "-id").values_list("unit_id", "total_amount", "payment_date", "payment_status")
+    for unit_id, amount, paid_at, payment_status in rows:
+        history[unit_id].append(
+            {
+                "amount": f"{amount:.2f}" if amount is not None else "0.00",
+                "date": paid_at.date().isoformat() if paid_at else None,
+                "status": payment_status,
+            }
+        )
+    return history
+
+
+def refresh_image_manifests(unit_ids) -> dict:
+    """
+    Rebuild image_urls / cover_image_url of these units from their UnitImage rows: one read and
+    one bulk UPDATE, whatever the number of units. Returns {unit_id: image_urls}.
+    """
+    manifests = {pk: [] for pk in unit_ids if pk is not None}
+    if not manifests:
+        return manifests
+    rows = UnitImage.objects.filter(unit_id__in=list(manifests)).order_by("unit_id", "id").values_list("unit_id", "image")
+    for unit_id, image in rows:
+        manifests[unit_id].append(image_url(image))
+
+    now = timezone.now()
+    units = [Unit(pk=pk, image_urls=urls, cover_image_url=urls[0] if urls else None, updated_at=now) for pk, urls in manifests.items()]
+    Unit.objects.bulk_update(units, ["image_urls", "cover_image_url", "updated_at"], batch_size=500)
+    return manifests
+
+
+def _refresh_unit_manifest(unit) -> None:
+    unit.image_urls = refresh_image_manifests([unit.pk])[unit.pk]
+    unit.cover_image_url = unit.image_urls[0] if unit.image_urls else None
+
+
+def add_unit_images(unit, files) -> list:
+    """
+    Upload `files` concurrently and insert their UnitImage rows with one bulk_create.
+    Returns the new rows in input order; uploaded files are removed again if the insert fails.
+    """
+    resources = upload_images(files)
+    try:
+        with transaction.atomic():
+            images = UnitImage.objects.bulk_create([UnitImage(unit=unit, image=resource) for resource in resources])
+            _refresh_unit_manifest(unit)
+    except Exception:
+        delete_images(resources)
+        raise
+    return images
+
+
+def _delete_unit_images(unit, image_ids=None) -> int:
+    images = unit.images.all() if image_ids is None else unit.images.filter(pk__in=image_ids)
+    resources = [image.image for image in images.only("id", "image")]
+    if resources:
+        images.delete()
+        transaction.on_commit(lambda: delete_images(resources))
+    return len(resources)
+
+
+def remove_unit_images(unit, image_ids=None) -> int:
+    """Delete the given images of `unit` (all of them when image_ids is None); stored files go once the transaction commits."""
+    with transaction.atomic():
+        removed = _delete_unit_images(unit, image_ids)
+        if removed:
+            _refresh_unit_manifest(unit)
+    return removed
+
+
+def replace_unit_images(unit, files) -> list:
+    """Replace every image of `unit` with `files` (uploads first, so a failed upload keeps the old set)."""
+    resources = upload_images(files)
+    try:
+        with transaction.atomic():
+            _delete_unit_images(unit)
+            images = UnitImage.objects.bulk_create([UnitImage(unit=unit, image=resource) for resource in resources])
+            _refresh_unit_manifest(unit)
+    except Exception:
+        delete_images(resources)
+        raise
+    return images
+
+
+def refresh_unit_coordinates(queryset=None) -> int:
+    """Re-parse latitude / longitude from location_url for every unit in `queryset` (default: all); returns the number changed."""
+    queryset = Unit.objects.all() if queryset is None else queryset
+    now = timezone.now()
+    changed = []
+    for pk, url, lat, lng in queryset.values_list("pk", "location_url", "latitude", "longitude").iterator(chunk_size=2000):
+        point = parse_map_coordinates(url) or (None, None)
+        if point != (lat, lng):
+            changed.append(Unit(pk=pk, latitude=point[0], longitude=point[1], updated_at=now))
+    Unit.objects.bulk_update(changed, ["latitude", "longitude", "updated_at"], batch_size=500)
+    return len(changed)
+
+
+# Nearest-k search widens its box from here, doubling until enough units are inside the circle
+NEAREST_START_KM = 2.0
+MAX_SEARCH_KM = math.pi * EARTH_RADIUS_KM
+
+
+def units_near(queryset, lat, lng, radius_km=None, limit=20) -> list:
+    """
+    [(unit_id, distance_km), ...] nearest first for units of `queryset` with coordinates:
+    within radius_km when given, at most `limit` of them. Candidates come from an indexed
+    bounding-box query and are checked with the exact haversine distance.
+    """
+    queryset = queryset.filter(latitude__isnull=False, longitude__isnull=False)
+    radius = radius_km if radius_km is not None else NEAREST_START_KM
+    while True:
+        candidates = queryset.filter(bounding_box(lat, lng, radius)).values_list("pk", "latitude", "longitude")
+        found = sorted((distance, pk) for pk, distance in ((pk, haversine_km(lat, lng, p_lat, p_lng)) for pk, p_lat, p_lng in candidates) if distance <= radius)
+        # A circle holding `limit` units contains the `limit` nearest ones
+        if radius_km is not None or len(found) >= limit or radius >= MAX_SEARCH_KM:
+            return [(pk, distance) for distance, pk in found[:limit]]
+        radius = min(radius * 2, MAX_SEARCH_KM)
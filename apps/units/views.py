@@ -1,21 +1,50 @@
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.models import City, District
+from apps.payments.cache import GLOBAL_SCOPE, summary_version_token
+from apps.rents.models import Rent
+from apps.tenants.models import Tenant
 from apps.units.filters import UnitFilter
-from apps.units.models import Unit
-from apps.units.serializers import UnitListSerializer, UnitSerializer
+from apps.units.models import Unit, UnitImage, UnitRateRule
+from apps.units.pricing import quote_units
+from apps.units.serializers import (
+    UnitAvailabilityQuerySerializer,
+    UnitAvailabilitySerializer,
+    UnitDateWindowQuerySerializer,
+    UnitImageSerializer,
+    UnitImageUploadSerializer,
+    UnitListSerializer,
+    UnitNearbyQuerySerializer,
+    UnitNearbySerializer,
+    UnitQuoteResultSerializer,
+    UnitQuoteSerializer,
+    UnitRateRuleSerializer,
+    UnitSerializer,
+    UnitTimelineSerializer,
+    parse_unit_sections,
+)
+from apps.units.utils import add_unit_images, remove_unit_images, units_busy_intervals, units_near, units_occupancy, with_current_tenant
+from config.choices import Status
 
 
-class UnitViewSet(ModelViewSet):
+class UnitViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Manage Units:
     - Supports full CRUD
-    - Auto updates status on read and write
+    - Status follows today's rents: enforced on write, after rent writes and by the daily
+      `manage.py sync_unit_statuses` sweep; reads have no side effects
     - Filterable by multiple fields including lease dates
+    - ?include=images,payments_summary,unit_payment_summary,rent_payment_history picks the
+      expensive sections: all of them by default on a single unit, none by default on lists
     """
 
     queryset = Unit.objects.select_related("city", "district", "owner").all()
@@ -24,33 +53,30 @@ class UnitViewSet(ModelViewSet):
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = UnitFilter
     ordering_fields = ["name", "price_per_day", "status", "lease_start", "lease_end"]
+    conditional_models = (Unit, Rent, Tenant, City, District, UnitImage)
+
+    def get_conditional_parts(self):
+        # Unit details embed payment summaries
+        return [summary_version_token([GLOBAL_SCOPE])]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "action", None) == "list":
+            # Live occupancy for the list rows, inside the same query
+            queryset = with_current_tenant(queryset)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if "include" in self.request.query_params:
+            context["include"] = parse_unit_sections(self.request.query_params["include"])
+        return context
 
     def get_serializer_class(self):
         if getattr(self, "action", None) == "list":
             return UnitListSerializer
         return UnitSerializer
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-
-        # Update status dynamically before returning list
-        for unit in queryset:
-            unit.update_status()
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        instance.update_status()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
-
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -70,3 +96,127 @@ class UnitViewSet(ModelViewSet):
         instance = self.get_object()
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["get"], url_path="availability")
+    def availability(self, request):
+        """
+        Free intervals of every (filtered) unit within ?from=&to= (inclusive).
+        Accepts all list filters; ?fully_available=true keeps only units free for the whole window.
+        """
+        params = UnitAvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        window = (params.validated_data["from"], params.validated_data["to"])
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by("name", "id")
+        if params.validated_data["fully_available"]:
+            overlapping = Rent.objects.filter(unit=OuterRef("pk"), rent_start__lte=window[1], rent_end__gte=window[0])
+            queryset = queryset.exclude(status=Status.IN_MAINTENANCE).exclude(Exists(overlapping))
+
+        page = self.paginate_queryset(queryset)
+        units = page if page is not None else list(queryset)
+        # One ordered rent query for the whole page, merged per unit in Python
+        busy = units_busy_intervals([unit.pk for unit in units], *window)
+        serializer = UnitAvailabilitySerializer(units, many=True, context={"busy": busy, "window": window})
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"], url_path="timeline")
+    def timeline(self, request):
+        """
+        Compact per-unit occupancy for a booking calendar over ?from=&to= (inclusive).
+        Accepts all list filters; rents are read with one range query for the page.
+        """
+        params = UnitDateWindowQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        window = (params.validated_data["from"], params.validated_data["to"])
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by("name", "id")
+
+        page = self.paginate_queryset(queryset)
+        units = page if page is not None else list(queryset)
+        serializer = UnitTimelineSerializer(units, many=True, context={"segments": units_occupancy(units, *window)})
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"], url_path="nearby")
+    def nearby(self, request):
+        """
+        Units around ?lat=&lng=, nearest first, with distance_km. ?radius_km= limits the distance,
+        ?limit= caps the count (nearest-k). Accepts all list filters; units without coordinates are skipped.
+        """
+        params = UnitNearbyQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        queryset = self.filter_queryset(self.get_queryset())
+        nearest = units_near(queryset, query["lat"], query["lng"], radius_km=query.get("radius_km"), limit=query["limit"])
+        distances = dict(nearest)
+        units = with_current_tenant(self.get_queryset()).in_bulk(list(distances))
+        serializer = UnitNearbySerializer([units[pk] for pk, _ in nearest], many=True, context={"distances": distances})
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["post"], url_path="quote")
+    def quote(self, request):
+        """
+        Price one stay for many units at once from their rate rules.
+        Body: {"from": check-in, "to": check-out, "units": [ids]}; results keep the order of `units`.
+        """
+        params = UnitQuoteSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        unit_ids = list(dict.fromkeys(data["units"]))
+        units = Unit.objects.only("id", "name", "type", "price_per_day").in_bulk(unit_ids)
+        missing = [pk for pk in unit_ids if pk not in units]
+        if missing:
+            return Response({"units": [f"Unknown unit id(s): {', '.join(map(str, missing))}."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        quotes = quote_units(units.values(), data["from"], data["to"])
+        rows = [{"unit_id": pk, "unit_name": units[pk].name, **quotes[pk]} for pk in unit_ids]
+        return Response(
+            {
+                "from": data["from"],
+                "to": data["to"],
+                "nights": (data["to"] - data["from"]).days,
+                "quotes": UnitQuoteResultSerializer(rows, many=True).data,
+            }
+        )
+
+    @action(detail=True, methods=["get", "post"], url_path="images")
+    def images(self, request, pk=None):
+        """
+        GET: the unit's images. POST (multipart `images`, repeatable): add images without touching
+        the existing ones; files are uploaded concurrently and inserted with one bulk_create.
+        """
+        unit = self.get_object()
+        if request.method == "GET":
+            return Response(UnitImageSerializer(unit.images.order_by("id"), many=True).data)
+
+        serializer = UnitImageUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created = add_unit_images(unit, serializer.validated_data["images"])
+        return Response(UnitImageSerializer(created, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["delete"], url_path=r"images/(?P<image_id>\d+)")
+    def delete_image(self, request, pk=None, image_id=None):
+        """Remove one image of the unit (row now, stored file after commit)."""
+        unit = self.get_object()
+        get_object_or_404(UnitImage, pk=image_id, unit=unit)
+        remove_unit_images(unit, [image_id])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UnitRateRuleViewSet(ModelViewSet):
+    """Seasonal / weekday rate rules used by /units/quote/ and to price new rents; filter by ?unit= or ?unit_type=."""
+
+    queryset = UnitRateRule.objects.select_related("unit").all()
+    serializer_class = UnitRateRuleSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["unit", "unit_type"]
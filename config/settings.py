@@ -1,8 +1,10 @@
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 from urllib.parse import parse_qsl, urlparse
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +14,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 DEBUG = os.getenv("DEBUG", "False") == "True"
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
 
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "*").split(",")
 
@@ -68,6 +71,11 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Unit image storage backend (apps.units.storage); LocalImageStorage keeps files under MEDIA_ROOT
+UNIT_IMAGE_STORAGE = os.getenv("UNIT_IMAGE_STORAGE", "apps.units.storage.CloudinaryImageStorage")
+# Concurrent uploads per request
+UNIT_IMAGE_UPLOAD_WORKERS = int(os.getenv("UNIT_IMAGE_UPLOAD_WORKERS", 4))
+
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
@@ -114,6 +122,25 @@ DATABASES = {
     }
 }
 
+# Cache (payment summaries). Summary version counters live in the cache, so every worker process
+# must share it: a process-local backend would let other workers serve stale summaries and 304s.
+# Local memory is only allowed with DEBUG or under tests; otherwise the database cache is the
+# default (run `python manage.py createcachetable`), or point CACHE_BACKEND/CACHE_LOCATION at Redis.
+LOCAL_CACHE_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", LOCAL_CACHE_BACKEND if DEBUG or TESTING else "django.core.cache.backends.db.DatabaseCache")
+if CACHE_BACKEND == LOCAL_CACHE_BACKEND and not (DEBUG or TESTING):
+    raise ImproperlyConfigured("CACHE_BACKEND must be shared between worker processes (database, Redis or Memcached) unless DEBUG is on.")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv("CACHE_LOCATION", "rems_cache"),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", 60 * 60)),
+    }
+}
+# Bounded eviction for the Django-managed backends; Redis/Memcached evict with their own memory limits
+if CACHE_BACKEND.endswith(("LocMemCache", "FileBasedCache", "DatabaseCache")):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 5000))}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",